@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+import time
+import zlib
+from typing import Optional
+
+import sqlite_store
+
+# Cache of per-page analysis results keyed by a hash of the fetched body, so an article that
+# shows up again (for another keyword, or unchanged since the last run) is neither re-extracted
+# nor re-scored. Every entry carries the version string of the code that produced it; a lookup
+# with a different version is a miss, so changing the extractor or the scorer invalidates old
+# entries. The file is trimmed LRU-first once it grows past max_bytes (see sqlite_store).
+
+DEFAULT_PATH = os.getenv("ANALYSIS_CACHE_PATH", os.path.join(".cache", "analysis.sqlite3"))
+DEFAULT_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    data BLOB NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_accessed_at ON analyses (accessed_at);
+"""
+
+
+def content_key(body: bytes, content_type: str = "") -> str:
+    """Hash of a fetched body (and its Content-Type, which decides how it is decoded)."""
+    digest = hashlib.sha256(body)
+    digest.update(b"\0" + (content_type or "").encode("utf-8", "replace"))
+    return digest.hexdigest()
+
+
+class AnalysisCache(sqlite_store.SQLiteStore):
+    """SQLite store of JSON analysis results (zlib-compressed) keyed by content_key()."""
+
+    def __init__(self, path: str = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(path, "analyses", _SCHEMA, max_bytes)
+
+    def get(self, key: str, version: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT version, data FROM analyses WHERE key = ?", (key,)).fetchone()
+            if row is None or row[0] != version:
+                self.stats["misses"] += 1
+                return None
+            self._touch(key)
+            self.stats["hits"] += 1
+        try:
+            return json.loads(zlib.decompress(row[1]))
+        except (zlib.error, ValueError):
+            return None
+
+    def put(self, key: str, version: str, data: dict) -> None:
+        blob = zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"), 6)
+        with self._lock:
+            self._store({"key": key, "version": version, "data": blob, "accessed_at": time.time(), "size": len(blob)})
+
+
+_default_cache = sqlite_store.Singleton(AnalysisCache)
+
+
+def get_default_cache() -> AnalysisCache:
+    """Return the process-wide analysis cache (shared by all Streamlit sessions)."""
+    return _default_cache.get()
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of the default cache since process start."""
+    return dict(get_default_cache().stats)
@@ -0,0 +1,72 @@
+"""Agent setup overhead per "Start Analysis" click: building the six LLM clients and agents
+from scratch every time (what the app did before llm_provider) versus the shared, memoized
+ones. No requests are sent; a placeholder API key is used if none is configured.
+
+Usage: python bench_agents.py [clicks]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("OPENROUTER_API_KEY", "sk-placeholder")
+
+import llm_provider
+from analyzer_agent import get_analyzer_agent
+from cleaneragent import get_cleaner_agent
+from comment_agent import get_comment_agent
+from crawleragent import get_crawler_agent
+from reporter_agent import get_reporter_agent
+from sentiment_agent import get_sentiment_agent
+
+FACTORIES = [get_crawler_agent, get_cleaner_agent, get_analyzer_agent, get_sentiment_agent, get_reporter_agent, get_comment_agent]
+# (temperature) of each agent's client, for timing the clients alone
+TEMPERATURES = [0.2, 0.2, 0.2, 0.3, 0.2, 0.7]
+
+
+def timed(fn, clicks: int) -> float:
+    """Mean milliseconds per click."""
+    start = time.perf_counter()
+    for _ in range(clicks):
+        fn()
+    return (time.perf_counter() - start) / clicks * 1000
+
+
+def fresh_clients() -> None:
+    for t in TEMPERATURES:
+        llm_provider._create_llm(llm_provider.DEFAULT_MODEL, t)
+
+
+def shared_clients() -> None:
+    for t in TEMPERATURES:
+        llm_provider.get_llm(temperature=t)
+
+
+def fresh_agents() -> None:
+    llm_provider._clients.clear()
+    for factory in FACTORIES:
+        factory.__wrapped__()
+
+
+def shared_agents() -> None:
+    for factory in FACTORIES:
+        factory()
+
+
+def main(clicks: int = 10) -> int:
+    print(f"{'per click (6 agents)':<28} {'before ms':>10} {'after ms':>10}")
+    shared_clients()  # the first click builds them; later clicks (and sessions) reuse them
+    print(f"{'LLM clients':<28} {timed(fresh_clients, clicks):>10.1f} {timed(shared_clients, clicks):>10.2f}")
+    try:
+        before = timed(fresh_agents, clicks)
+        shared_agents()
+        after = timed(shared_agents, clicks)
+    except Exception as e:
+        print(f"agents could not be built here ({type(e).__name__}: {str(e).splitlines()[0]})")
+        return 1
+    print(f"{'LLM clients + agents':<28} {before:>10.1f} {after:>10.2f}")
+    print(f"setup this process: {llm_provider.setup_stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*[int(a) for a in sys.argv[1:2]]))
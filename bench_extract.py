@@ -0,0 +1,45 @@
+"""Compare the main-content extractor (extractor.extract) with the previous approach
+(every p/h1/h2/h3 inside <article>/<main>/page, via html_parser) on the article pages in
+fixtures/: time per page and size of the extracted text. The fixtures are synthetic, hand-written
+pages modelled on common templates (a WordPress-style blog post, a forum thread, a news story and
+a Blogger "Simple" theme post with comments and a sidebar), not recordings of live sites.
+
+Usage: python bench_extract.py [repeats]
+"""
+import os
+import sys
+import time
+
+import extractor
+import html_parser
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _time(func, html: str, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func(html)
+    return (time.perf_counter() - start) * 1000 / repeats
+
+
+def main(repeats: int = 50) -> int:
+    approaches = [("extractor/tokenizer", lambda html: extractor.extract(html, "html.parser")["text"])]
+    if "selectolax" in html_parser.available_backends():
+        approaches.insert(0, ("extractor/selectolax", lambda html: extractor.extract(html, "selectolax")["text"]))
+    for backend in html_parser.available_backends():
+        approaches.append((f"old/{backend}", lambda html, b=backend: html_parser.parse(html, b).main_text()))
+
+    print(f"{'page':<20} {'approach':<20} {'ms':>8} {'chars':>7}")
+    for name in sorted(os.listdir(FIXTURES)):
+        if not name.startswith("article_"):
+            continue
+        with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+            html = f.read()
+        for label, func in approaches:
+            print(f"{name:<20} {label:<20} {_time(func, html, repeats):>8.3f} {len(func(html)):>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
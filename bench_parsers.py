@@ -0,0 +1,76 @@
+"""Check that every installed HTML parser backend gives identical output on the saved
+fixtures, and time each backend. Also checks main_text() on a few malformed snippets, where the
+backends are known to differ (see MALFORMED).
+
+Usage: python bench_parsers.py [repeats]
+Exits with status 1 if any backend disagrees with the "html.parser" reference on a fixture, or
+gives other than its expected output on a malformed snippet.
+"""
+import os
+import sys
+import time
+
+import html_parser
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# name -> (html, main_text() for selectolax and lxml, main_text() for html.parser).
+# selectolax and lxml apply HTML's implied end tags; html.parser leaves unclosed elements open
+# until their parent closes, so text after an unclosed <p> is also inside it and is repeated.
+MALFORMED = {
+    "unclosed_p": ("<article><p>one<p>two<div>three</div></article>", "one two", "one two three two three"),
+    "stray_end_tags": ("<main><p>one</p></span><h2>two</h3><p>three</main>", "one two three", "one two three three"),
+    "no_container": ("<p>one<h1>two</h1>three", "one two", "one two three two"),
+    "p_in_table": ("<table><p>para</p><tr><td><p>cell</p></td></tr></table>", "para cell", "para cell"),
+}
+
+
+def _queries(doc) -> dict:
+    return {
+        "ddg_links": doc.hrefs("a.result__a"),
+        "all_links": doc.hrefs("a[href]"),
+        "bing_links": doc.first_hrefs("li.b_algo"),
+        "main_text": doc.main_text(),
+    }
+
+
+def main(repeats: int = 50) -> int:
+    pages = {}
+    for name in sorted(os.listdir(FIXTURES)):
+        if name.endswith(".html"):
+            with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+                pages[name] = f.read()
+
+    failures = 0
+    for name, html in pages.items():
+        reference = _queries(html_parser.parse(html, "html.parser"))
+        for backend in html_parser.available_backends():
+            got = _queries(html_parser.parse(html, backend))
+            for key, expected in reference.items():
+                if got[key] != expected:
+                    failures += 1
+                    print(f"MISMATCH {name} [{backend}] {key}")
+
+    for name, (html, expected, expected_html_parser) in MALFORMED.items():
+        for backend in html_parser.available_backends():
+            want = expected_html_parser if backend == "html.parser" else expected
+            got = html_parser.parse(html, backend).main_text()
+            if got != want:
+                failures += 1
+                print(f"MISMATCH malformed/{name} [{backend}] main_text: {got!r} != {want!r}")
+
+    print(f"{'backend':<12} {'ms / page (all queries)':>24}")
+    for backend in html_parser.available_backends():
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for html in pages.values():
+                _queries(html_parser.parse(html, backend))
+        elapsed = (time.perf_counter() - start) * 1000 / (repeats * len(pages))
+        print(f"{backend:<12} {elapsed:>24.3f}")
+
+    print("parity: OK" if not failures else f"parity: {failures} mismatches")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
@@ -0,0 +1,115 @@
+"""Compare the batch sentiment scorer (sentiment_engine.score_batch, and score_documents which
+scores section by section) with per-document TextBlob on the article pages in fixtures/ plus
+a synthetic corpus: throughput and largest score difference (must stay within
+sentiment_engine.TOLERANCE). Then the process-pool mode
+(sentiment_engine.score_documents) on the synthetic corpus with 1..max workers, to show how
+throughput scales with cores.
+
+Usage: python bench_sentiment.py [synthetic docs] [words per doc] [max workers]
+"""
+import os
+import random
+import sys
+import time
+
+from textblob import TextBlob
+
+import extractor
+import sentiment_engine
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+_FILLER = (
+    "the a of and to in is it that for on with as was at by this be are from or an but have "
+    "they which one you were all we when there can has more if will would about out so what "
+    "people time year market report company city council energy project plan users update"
+).split()
+_PUNCT = [".", ",", "!", "?", ";", ":", " (!)", " :)", " :(", "...", '"', "'s", "n't"]
+
+
+def fixture_texts() -> list:
+    texts = []
+    for name in sorted(os.listdir(FIXTURES)):
+        if name.startswith("article_"):
+            with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+                texts.append(extractor.extract(f.read())["text"])
+    return texts
+
+
+def synthetic_texts(docs: int, words: int, seed: int = 7) -> list:
+    """Random text mixing lexicon words, negations, modifiers, filler and punctuation."""
+    rng = random.Random(seed)
+    lexicon = sorted(w for w in sentiment_engine.get_lexicon().vocab if w.isalpha())
+    negations = ["not", "no", "never"]
+    modifiers = ["very", "really", "extremely", "quite", "too", "absolutely"]
+    texts = []
+    for _ in range(docs):
+        out = []
+        for _ in range(words):
+            r = rng.random()
+            if r < 0.08:
+                out.append(rng.choice(lexicon))
+            elif r < 0.10:
+                out.append(rng.choice(negations))
+            elif r < 0.12:
+                out.append(rng.choice(modifiers))
+            elif r < 0.18:
+                out[-1:] = [out[-1] + rng.choice(_PUNCT)] if out else []
+            else:
+                word = rng.choice(_FILLER)
+                out.append(word.capitalize() if rng.random() < 0.05 else word)
+        texts.append(" ".join(out))
+    return texts
+
+
+def textblob_scores(texts: list) -> list:
+    # the old per-document path: one TextBlob per text, .sentiment read twice
+    return [(TextBlob(t).sentiment.polarity, TextBlob(t).sentiment.subjectivity) for t in texts]
+
+
+def scaling(texts: list, max_workers: int) -> None:
+    size = sum(len(t.encode("utf-8")) for t in texts) / 1e6
+    print(f"\n{'workers':>7} {'docs/s':>9} {'MB/s':>7} {'speedup':>8}   (cores available: {os.cpu_count()})")
+    base = None
+    for workers in range(1, max_workers + 1):
+        if workers > 1:
+            # start the workers (and load their lexicons) outside the timed region
+            list(sentiment_engine._get_pool(workers).map(sentiment_engine.score_batch, [[t] for t in texts[:workers * 2]]))
+        start = time.perf_counter()
+        sentiment_engine.score_documents(texts, workers=workers)
+        elapsed = time.perf_counter() - start
+        base = base or elapsed
+        print(f"{workers:>7} {len(texts) / elapsed:>9.1f} {size / elapsed:>7.2f} {base / elapsed:>7.2f}x")
+
+
+def main(docs: int = 200, words: int = 2000, max_workers: int = 0) -> int:
+    sentiment_engine.get_lexicon()  # load outside the timed region, as a long-running process would
+    corpora = [("fixtures", fixture_texts()), (f"synthetic {docs}x{words}", synthetic_texts(docs, words))]
+    worst = 0.0
+    print(f"{'corpus':<22} {'scorer':<10} {'docs/s':>9} {'MB/s':>7} {'max |diff|':>11}")
+    for label, texts in corpora:
+        size = sum(len(t.encode("utf-8")) for t in texts) / 1e6
+        start = time.perf_counter()
+        ref = textblob_scores(texts)
+        tb = time.perf_counter() - start
+        start = time.perf_counter()
+        ours = sentiment_engine.score_batch(texts)
+        batch = time.perf_counter() - start
+        start = time.perf_counter()
+        docs = sentiment_engine.score_documents(texts)
+        sectioned = time.perf_counter() - start
+        diff = max(max(abs(a[0] - b[0]), abs(a[1] - b[1])) for a, b in zip(ours, ref))
+        section_diff = max(max(abs(d["polarity"] - b[0]), abs(d["subjectivity"] - b[1])) for d, b in zip(docs, ref))
+        worst = max(worst, diff, section_diff)
+        print(f"{label:<22} {'textblob':<10} {len(texts) / tb:>9.1f} {size / tb:>7.2f}")
+        print(f"{label:<22} {'batch':<10} {len(texts) / batch:>9.1f} {size / batch:>7.2f} {diff:>11.5f}")
+        print(f"{label:<22} {'sections':<10} {len(texts) / sectioned:>9.1f} {size / sectioned:>7.2f} {section_diff:>11.5f}")
+    ok = worst <= sentiment_engine.TOLERANCE
+    print(f"largest difference {worst:.5f} ({'within' if ok else 'OUTSIDE'} tolerance {sentiment_engine.TOLERANCE})")
+    scaling(corpora[1][1], max_workers or os.cpu_count() or 1)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    sys.exit(main(*args))
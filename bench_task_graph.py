@@ -0,0 +1,43 @@
+"""Wall time of the app's six agent tasks run one after another (the old single sequential
+Crew) versus task_graph.run_graph, with each task simulated as a fixed-latency LLM call.
+The graph is the one streamlit_app_fast.py builds: Crawler -> Cleaner -> (Analyzer |
+Sentiment) -> Reporter -> Comment.
+
+Usage: python bench_task_graph.py [seconds per task] [concurrency]
+"""
+import sys
+import time
+
+import task_graph
+
+DEPENDENCIES = {
+    "crawl": [],
+    "clean": ["crawl"],
+    "analyze": ["clean"],
+    "sentiment": ["clean"],
+    "report": ["analyze", "sentiment"],
+    "comment": ["analyze", "sentiment", "report"],
+}
+
+
+def main(latency: float = 0.5, concurrency: int = task_graph.DEFAULT_CONCURRENCY) -> int:
+    def call(inputs):
+        time.sleep(latency)  # stands in for a blocking LLM request
+        return inputs
+
+    graph = {name: (deps, call) for name, deps in DEPENDENCIES.items()}
+    start = time.perf_counter()
+    for name in DEPENDENCIES:
+        call({})
+    sequential = time.perf_counter() - start
+    start = time.perf_counter()
+    task_graph.run_graph(graph, concurrency=concurrency)
+    parallel = time.perf_counter() - start
+    print(f"tasks {len(graph)}, longest chain {task_graph.depth(graph)}, concurrency {concurrency}")
+    print(f"sequential {sequential:.2f}s  graph {parallel:.2f}s  speedup {sequential / parallel:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:3]
+    sys.exit(main(float(args[0]) if args else 0.5, *[int(a) for a in args[1:]]))
@@ -1,23 +1,13 @@
 from crewai import Agent
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv
-import os
 
-load_dotenv()
+from llm_provider import get_llm, shared_agent
 
+
+@shared_agent
 def get_comment_agent():
     """Create and return the Comment Agent"""
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        api_key=os.getenv("OPENROUTER_API_KEY"),
-        base_url="https://openrouter.ai/api/v1",
-        model_kwargs={
-            "extra_headers": {
-                "HTTP-Referer": os.getenv("OPENROUTER_SITE_URL", "http://localhost:3000"),
-                "X-Title": os.getenv("OPENROUTER_APP_NAME", "CrewAI App"),
-            }
-        }
-    )
+    # a little more varied than the analysis agents; comments should not all read alike
+    llm = get_llm(temperature=0.7)
     
     return Agent(
         name="Comment Generator Agent",
@@ -0,0 +1,135 @@
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+import llm_provider
+
+# Blog comments for many articles at once. Instead of one agent + one-task Crew per URL, the
+# articles are packed into a few JSON-mode chat calls (split so each prompt stays under
+# TOKEN_BUDGET and MAX_ITEMS articles); every returned comment is checked on its own, and only
+# the articles whose comment was missing or invalid are sent again (up to RETRIES more rounds).
+
+TOKEN_BUDGET = int(os.getenv("COMMENT_BATCH_TOKENS", "3000"))
+MAX_ITEMS = int(os.getenv("COMMENT_BATCH_MAX_ITEMS", "15"))
+RETRIES = int(os.getenv("COMMENT_BATCH_RETRIES", "1"))
+CONCURRENCY = int(os.getenv("COMMENT_BATCH_CONCURRENCY", "3"))
+EXCERPT_CHARS = 600
+MIN_WORDS = 8
+
+SYSTEM_PROMPT = (
+    "You are an expert at crafting authentic, engaging blog comments. Your comments are natural, "
+    "conversational, show genuine engagement with the article and adapt their tone to its sentiment "
+    "and topic. You write one comment per article you are given."
+)
+
+_NOT_A_COMMENT_RE = re.compile(r"^\s*(?:#+\s|\*\*|comment\s*\d*\s*:)", re.I)
+
+
+def _item_text(n: int, item: dict) -> str:
+    excerpt = (item.get("excerpt") or "")[:EXCERPT_CHARS]
+    sentiment = item.get("label") or "unknown"
+    if item.get("polarity") is not None:
+        sentiment += f" (polarity={item['polarity']})"
+    return f"[{n}] URL: {item.get('url', '')}\nSentiment: {sentiment}\nExcerpt: {excerpt}\n"
+
+
+def _instructions(topics: List[str], max_words: int, retry: bool = False) -> str:
+    topic_line = f" Where it fits, reference these topics: {', '.join(topics)}." if topics else ""
+    # a retry must not be answered from llm_cache with the same unusable response
+    retry_line = f" Each comment must be 1-2 full sentences of {MIN_WORDS} to {max_words} words." if retry else ""
+    return (
+        f"Write a short, natural, human-sounding comment (1-2 sentences, at most {max_words} words) for "
+        f"each article below.{topic_line}{retry_line} No headings, no markdown, no explanations.\n"
+        'Answer with a JSON object {"comments": [{"id": <article number>, "comment": "<text>"}, ...]} '
+        "with exactly one entry per article.\n\n"
+    )
+
+
+def _chunks(indices: List[int], texts: dict, budget: int) -> List[List[int]]:
+    """Split article indices into batches whose texts fit `budget` tokens and MAX_ITEMS."""
+    chunks, current, used = [], [], 0
+    for i in indices:
+        cost = llm_provider.estimate_tokens(texts[i])
+        if current and (used + cost > budget or len(current) >= MAX_ITEMS):
+            chunks.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _validate(comment, max_words: int) -> Optional[str]:
+    """The cleaned comment, or None if it is not a usable comment."""
+    if not isinstance(comment, str):
+        return None
+    comment = comment.strip().strip('"').strip()
+    words = len(comment.split())
+    if words < MIN_WORDS or words > max_words * 1.5 or _NOT_A_COMMENT_RE.match(comment):
+        return None
+    return comment
+
+
+def _call(llm, instructions: str, chunk: List[int], texts: dict) -> dict:
+    """One chat call for the articles in `chunk`; returns {index: raw comment} for parsed entries."""
+    prompt = instructions + "\n".join(texts[i] for i in chunk)
+    response = llm.invoke([SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content=prompt)])
+    data = json.loads(response.content)
+    entries = data.get("comments", []) if isinstance(data, dict) else data
+    out = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if isinstance(entry, dict):
+            try:
+                out[int(entry.get("id"))] = entry.get("comment")
+            except (TypeError, ValueError):
+                continue
+    return out
+
+
+def generate_comments(items: List[dict], topics: Optional[List[str]] = None, max_words: int = 60, token_budget: int = TOKEN_BUDGET) -> List[Tuple[bool, str]]:
+    """Comments for many articles in a few LLM calls.
+
+    `items` are dicts with "url" and optionally "excerpt", "label" and "polarity" (sentiment
+    records from sentiment_utils fit as they are). Returns one (True, comment) or
+    (False, error_message) per item, in input order.
+    """
+    if not items:
+        return []
+    try:
+        llm = llm_provider.get_llm(temperature=0.7).bind(response_format={"type": "json_object"})
+    except Exception as e:
+        return [(False, f"Failed to generate comment: {e}")] * len(items)
+    texts = {n: _item_text(n, item) for n, item in enumerate(items, 1)}
+    results = {}
+    errors = {}
+    todo = list(texts)
+    for attempt in range(RETRIES + 1):
+        instructions = _instructions(topics or [], max_words, retry=attempt > 0)
+        chunks = _chunks(todo, texts, max(1, token_budget - llm_provider.estimate_tokens(instructions)))
+        with ThreadPoolExecutor(max_workers=max(1, min(CONCURRENCY, len(chunks)))) as pool:
+            futures = [(chunk, pool.submit(_call, llm, instructions, chunk, texts)) for chunk in chunks]
+            for chunk, future in futures:
+                try:
+                    raw = future.result()
+                except Exception as e:
+                    raw = {}
+                    errors.update({i: f"Failed to generate comment: {e}" for i in chunk})
+                for i in chunk:
+                    if i not in raw:
+                        errors.setdefault(i, "no comment returned for this article")
+                        continue
+                    comment = _validate(raw[i], max_words)
+                    if comment:
+                        results[i] = comment
+                        errors.pop(i, None)
+                    else:
+                        errors[i] = "invalid comment returned for this article"
+        todo = [i for i in todo if i not in results]
+        if not todo:
+            break
+    return [(True, results[n]) if n in results else (False, errors.get(n, "no comment generated")) for n in texts]
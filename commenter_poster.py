@@ -1,18 +1,12 @@
 import os
 import time
 from typing import Tuple, Optional, List
-import requests
 import json
 from dotenv import load_dotenv
 
-# optional agent imports (used to generate comments when requested)
-try:
-    from comment_agent import get_comment_agent
-    from crewai import Crew, Task
-except Exception:
-    get_comment_agent = None
-    Crew = None
-    Task = None
+import http_client
+
+from comment_batch import generate_comments
 
 load_dotenv()
 
@@ -24,7 +18,7 @@ def post_comment_to_post(post_id: str, page_access_token: str, message: str, api
     url = f"https://graph.facebook.com/{api_version}/{post_id}/comments"
     payload = {"message": message, "access_token": page_access_token}
     try:
-        resp = requests.post(url, data=payload, timeout=20)
+        resp = http_client.post(url, data=payload, timeout=20)
     except Exception as e:
         return False, f"Network error when posting comment: {e}"
 
@@ -41,44 +35,12 @@ def post_comment_to_post(post_id: str, page_access_token: str, message: str, api
     return True, comment_id
 
 def generate_comment_for_url(url: str, topics: List[str], excerpt: Optional[str] = None, max_words: int = 60) -> Tuple[bool, str]:
-    """Use the Comment Agent to generate a short comment for the given URL and topics.
+    """Generate a short comment for the given URL and topics (see comment_batch).
 
     Returns (True, comment_text) or (False, error_message).
-    If the comment agent is not available, returns False.
+    For many URLs at once use comment_batch.generate_comments, which shares LLM calls.
     """
-    if get_comment_agent is None or Crew is None or Task is None:
-        return False, "Comment agent or Crew not available in this environment"
-
-    try:
-        agent = get_comment_agent()
-        topic_text = ", ".join(topics) if topics else ""
-        excerpt_text = (excerpt[:800] + "...") if excerpt else ""
-
-        desc = (
-            f"You are a concise comment-writer. Write a short, natural, human-sounding comment (1-2 sentences, ~30-60 words) for the article at {url}."
-            f" The comment should reference the following topics: {topic_text}."
-            f" Article excerpt: {excerpt_text}\n\n"
-            "Important: Output ONLY the comment text. No headings or extra commentary."
-        )
-
-        task = Task(description=desc, agent=agent, expected_output="Short comment text")
-        crew = Crew(agents=[agent], tasks=[task], verbose=False)
-        result = crew.kickoff()
-
-        # extract output (mirror the extraction used in the Streamlit UI)
-        out = ""
-        if hasattr(result, 'tasks_output') and result.tasks_output:
-            to = result.tasks_output[0]
-            out = getattr(to, 'raw', None) or getattr(to, 'exported_output', None) or str(to)
-        else:
-            # fall back to str(result)
-            out = str(result)
-
-        # basic cleanup
-        out = out.strip()
-        return True, out
-    except Exception as e:
-        return False, f"Failed to generate comment: {e}"
+    return generate_comments([{"url": url, "excerpt": excerpt or ""}], topics, max_words)[0]
 
 def create_page_post_and_comment(
     page_id: str,
@@ -150,7 +112,7 @@ def debug_facebook_token(token: str, app_token: Optional[str] = None, api_versio
 
     url = f"https://graph.facebook.com/{api_version}/debug_token"
     params = {"input_token": token, "access_token": app_token}
-    resp = requests.get(url, params=params, timeout=20)
+    resp = http_client.get(url, params=params, timeout=20)
     resp.raise_for_status()
     return resp.json()
 
@@ -174,7 +136,7 @@ def post_to_facebook_page(page_id: str, page_access_token: str, message: str, li
         payload["link"] = link
 
     try:
-        resp = requests.post(url, data=payload, timeout=20)
+        resp = http_client.post(url, data=payload, timeout=20)
     except Exception as e:
         return False, f"Network error when calling Graph API: {e}"
 
@@ -203,7 +165,7 @@ def get_page_token_from_user_token(user_token: str, target_page_id: Optional[str
     url = f"https://graph.facebook.com/{api_version}/me/accounts"
     params = {"access_token": user_token}
     try:
-        resp = requests.get(url, params=params, timeout=20)
+        resp = http_client.get(url, params=params, timeout=20)
     except Exception as e:
         return False, f"Network error when calling /me/accounts: {e}"
 
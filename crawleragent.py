@@ -1,42 +1,21 @@
 from crewai import Agent
-from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-import os
-import requests
-from bs4 import BeautifulSoup
-
-load_dotenv()
-
-def _create_llm(model: str = None, temperature: float = 0.2) -> ChatOpenAI:
-    """Create a ChatOpenAI LLM using OpenAI if OPENAI_API_KEY is set, else OpenRouter."""
-    load_dotenv()
-    model = model or os.getenv("LLM_MODEL", "gpt-4o-mini")
-
-    openai_key = os.getenv("OPENAI_API_KEY")
-    if openai_key:
-        return ChatOpenAI(model=model, temperature=temperature, api_key=openai_key)
-
-    # Fallback to OpenRouter
-    openrouter_key = os.getenv("OPENROUTER_API_KEY")
-    if not openrouter_key:
-        raise ValueError("Missing API key: set OPENAI_API_KEY or OPENROUTER_API_KEY in .env")
-
-    base_url = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
-    extra_headers = {
-        "HTTP-Referer": os.getenv("OPENROUTER_SITE_URL", "http://localhost"),
-        "X-Title": os.getenv("OPENROUTER_APP_NAME", "CrewAI App"),
-    }
-    return ChatOpenAI(
-        model=model,
-        temperature=temperature,
-        api_key=openrouter_key,
-        base_url=base_url,
-        model_kwargs={"extra_headers": extra_headers},
-    )
+import threading
+import time
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from urllib.parse import urljoin
+
+import html_parser
+import http_client
+import politeness
+from llm_provider import get_llm, shared_agent
+from search_cache import cached_call, cached_search
+from url_utils import unwrap_search_url, is_search_redirect
 
 
+@shared_agent
 def get_crawler_agent():
-    llm = _create_llm(model=os.getenv("LLM_MODEL", "gpt-4o-mini"), temperature=0.2)
+    llm = get_llm(temperature=0.2)
     
     return Agent(
         name="Crawler Agent",
@@ -53,6 +32,68 @@ def get_crawler_agent():
 CrawlerAgent = None
 
 
+def _scrape_duckduckgo(query: str, max_results: int = 10, timeout: int = 10, cancel: Optional[threading.Event] = None) -> list:
+    """Scrape DuckDuckGo's HTML results page. Raises on network/HTTP errors."""
+    # Prefer GET with query params for broader compatibility
+    resp = http_client.get(
+        "https://html.duckduckgo.com/html/",
+        params={"q": query},
+        timeout=timeout,
+    )
+    resp.raise_for_status()
+    if cancel is not None and cancel.is_set():
+        return []
+    doc = html_parser.parse(resp.text)
+    links = []
+    # First try known DuckDuckGo result anchors
+    for href in doc.hrefs("a.result__a"):
+        href = unwrap_search_url(href)
+        if href and href.startswith("http") and not is_search_redirect(href):
+            links.append(href)
+        if len(links) >= max_results:
+            break
+
+    # Fallback: collect any absolute http(s) hrefs on the page (broader but noisier)
+    if len(links) < max_results:
+        for href in doc.hrefs("a[href]"):
+            href = unwrap_search_url(href.strip())
+            if href.startswith("http") and href not in links and not is_search_redirect(href):
+                links.append(href)
+            if len(links) >= max_results:
+                break
+    # dedupe while preserving order
+    seen = set()
+    out = []
+    for u in links:
+        if u in seen:
+            continue
+        seen.add(u)
+        out.append(u)
+    return out
+
+
+def _scrape_bing(query: str, max_results: int = 10, timeout: int = 10, cancel: Optional[threading.Event] = None) -> list:
+    """Scrape Bing's HTML results page. Raises on network/HTTP errors."""
+    bresp = http_client.get("https://www.bing.com/search", params={"q": query}, headers={"User-Agent": http_client.BROWSER_USER_AGENT}, timeout=timeout)
+    bresp.raise_for_status()
+    if cancel is not None and cancel.is_set():
+        return []
+    doc = html_parser.parse(bresp.text)
+    links = []
+    for href in doc.first_hrefs('li.b_algo'):
+        href = unwrap_search_url(href)
+        if href.startswith('http'):
+            links.append(href)
+        if len(links) >= max_results:
+            break
+    # dedupe
+    seen = set(); out = []
+    for u in links:
+        if u in seen: continue
+        seen.add(u); out.append(u)
+    return out
+
+
 def search_duckduckgo(query: str, max_results: int = 10, timeout: int = 10) -> list:
     """Perform a lightweight DuckDuckGo HTML search and return a list of result URLs.
 
@@ -61,112 +102,151 @@ def search_duckduckgo(query: str, max_results: int = 10, timeout: int = 10) -> l
     use a search API (SerpAPI, Bing, Google) and respect terms of service.
     """
     try:
-        # Prefer GET with query params for broader compatibility
-        resp = requests.get(
-            "https://html.duckduckgo.com/html/",
-            params={"q": query},
-            headers={"User-Agent": "CrewAI-Bot/1.0"},
-            timeout=timeout,
-        )
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        links = []
-        # First try known DuckDuckGo result anchors
-        for a in soup.select("a.result__a"):
-            href = a.get("href")
-            if href and href.startswith("http"):
-                links.append(href)
-            if len(links) >= max_results:
-                break
-
-        # Fallback: collect any absolute http(s) hrefs on the page (broader but noisier)
-        if len(links) < max_results:
-            for a in soup.find_all("a", href=True):
-                href = a["href"].strip()
-                if href.startswith("http") and href not in links:
-                    links.append(href)
-                if len(links) >= max_results:
-                    break
-        # dedupe while preserving order
-        seen = set()
-        out = []
-        for u in links:
-            if u in seen:
-                continue
-            seen.add(u)
-            out.append(u)
-        return out
+        return cached_call("duckduckgo", _scrape_duckduckgo, query, max_results, timeout)
     except Exception:
         # If DuckDuckGo scraping fails for any reason, return empty and allow caller to try alternatives
         pass
 
-    # Fallback: try Bing HTML search (may return redirecting URLs which requests will follow)
-    try:
-        bresp = requests.get("https://www.bing.com/search", params={"q": query}, headers={"User-Agent": "Mozilla/5.0"}, timeout=timeout)
-        bresp.raise_for_status()
-        bsoup = BeautifulSoup(bresp.text, "html.parser")
-        links = []
-        for li in bsoup.select('li.b_algo'):
-            a = li.find('a', href=True)
-            if a:
-                href = a['href']
-                if href.startswith('http'):
-                    links.append(href)
-            if len(links) >= max_results:
-                break
-        # dedupe
-        seen = set(); out = []
-        for u in links:
-            if u in seen: continue
-            seen.add(u); out.append(u)
-        return out
-    except Exception:
-        return []
+    # Fallback: try Bing HTML search (click-tracking links are decoded locally where possible)
+    return search_bing(query, max_results, timeout)
     
 
+@cached_search("bing")
 def search_bing(query: str, max_results: int = 10, timeout: int = 10) -> list:
-    """Search Bing and return a list of result hrefs (may be redirecting Bing URLs)."""
+    """Search Bing and return a list of result hrefs.
+
+    Bing's /ck/a click-tracking links are decoded locally; links that cannot be decoded are
+    returned as-is for `resolve_final_urls` to follow.
+    """
     try:
-        bresp = requests.get("https://www.bing.com/search", params={"q": query}, headers={"User-Agent": "Mozilla/5.0"}, timeout=timeout)
-        bresp.raise_for_status()
-        bsoup = BeautifulSoup(bresp.text, "html.parser")
-        links = []
-        for li in bsoup.select('li.b_algo'):
-            a = li.find('a', href=True)
-            if a:
-                href = a['href']
-                if href.startswith('http'):
-                    links.append(href)
-            if len(links) >= max_results:
-                break
-        # dedupe
-        seen = set(); out = []
-        for u in links:
-            if u in seen: continue
-            seen.add(u); out.append(u)
-        return out
+        return _scrape_bing(query, max_results, timeout)
     except Exception:
         return []
 
 
-def resolve_final_urls(urls: list, timeout: int = 8) -> list:
-    """Follow redirects for each URL (HEAD first, then GET) and return final targets.
+# Engines queried by search_web, in tie-break order.
+_SEARCH_ENGINES = (("duckduckgo", _scrape_duckduckgo), ("bing", _scrape_bing))
+
+
+def _fuse_rankings(rankings: dict, k: int = 60) -> list:
+    """Reciprocal rank fusion: score(url) = sum over engines of 1 / (k + rank)."""
+    scores = {}
+    first_seen = {}
+    for name, _ in _SEARCH_ENGINES:
+        for rank, url in enumerate(rankings.get(name) or []):
+            scores[url] = scores.get(url, 0.0) + 1.0 / (k + rank + 1)
+            first_seen.setdefault(url, len(first_seen))
+    return sorted(scores, key=lambda u: (-scores[u], first_seen[u]))
+
+
+def search_web(query: str, max_results: int = 10, timeout: int = 10, deadline: float = 12) -> list:
+    """Query DuckDuckGo and Bing concurrently and return merged, deduped result URLs.
+
+    Results are ordered by reciprocal rank fusion. The call returns as soon as the engines that
+    have answered cover `max_results` unique URLs, or when `deadline` seconds have passed; the
+    engine still running is then told to stop (its response is not parsed) and its result dropped.
+    Each engine's ranking goes through the search cache on its own (the same entries as
+    search_duckduckgo/search_bing use); a cut-off engine stores nothing and the fused list is
+    not cached, so a later call asks that engine again.
+    """
+    cancel = threading.Event()
+    rankings = {}
+    executor = ThreadPoolExecutor(max_workers=len(_SEARCH_ENGINES))
+    futures = {
+        executor.submit(cached_call, name, fn, query, max_results, timeout, cancel=cancel): name
+        for name, fn in _SEARCH_ENGINES
+    }
+    try:
+        for fut in as_completed(futures, timeout=deadline):
+            try:
+                rankings[futures[fut]] = fut.result()
+            except Exception:
+                rankings[futures[fut]] = []
+            if len(_fuse_rankings(rankings)) >= max_results:
+                break
+    except FuturesTimeout:
+        pass
+    finally:
+        cancel.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+    return _fuse_rankings(rankings)[:max_results]
+
+
+_REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+def _resolve_one(url: str, timeout: float, deadline: float, max_redirects: int = 10) -> str:
+    """Follow redirects for one URL hop by hop without downloading any response body.
+
+    Each hop is a HEAD; if the server rejects HEAD we retry that hop with a streamed GET and
+    close it right after reading the status line and headers. Every hop waits for the host's
+    robots.txt clearance and rate limit (politeness scheduler).
+    """
+    current = url
+    for _ in range(max_redirects + 1):
+        if not politeness.get_default_scheduler().wait(current):
+            return url
+        hop_timeout = min(timeout, deadline - time.monotonic())
+        if hop_timeout <= 0:
+            return url
+        resp = http_client.head(current, allow_redirects=False, timeout=hop_timeout)
+        resp.close()
+        if resp.status_code >= 400:
+            resp = http_client.get(current, allow_redirects=False, stream=True, timeout=hop_timeout)
+            resp.close()
+        location = resp.headers.get("Location")
+        if resp.status_code in _REDIRECT_STATUSES and location:
+            current = urljoin(current, location)
+            continue
+        return current if resp.ok else url
+    return url
+
+
+def resolve_final_urls(urls: list, timeout: int = 8, max_workers: int = 8, total_timeout: float = 20, wrapped_only: bool = False) -> list:
+    """Follow redirects for each URL in parallel and return final targets.
 
     This helps clean up redirecting search result URLs (e.g., Bing ck/ links) to the real targets.
+    DuckDuckGo/Bing wrapper links are first decoded offline; only the rest go to the network
+    (with `wrapped_only=True`, only wrapper links that could not be decoded do).
+    Up to `max_workers` URLs are resolved at once over the shared keep-alive pool in http_client.
+    The whole call is bounded by `total_timeout` seconds; URLs not resolved by then are kept as-is.
     """
+    if not urls:
+        return []
+    deadline = time.monotonic() + total_timeout
     out = []
-    for u in urls:
-        try:
-            # Try HEAD to follow redirects quickly
-            r = requests.head(u, allow_redirects=True, timeout=timeout)
-            final = r.url if r.ok else u
-            # If HEAD returned the same or not ok, try GET as a fallback
-            if final == u or not r.ok:
-                r2 = requests.get(u, allow_redirects=True, timeout=timeout)
-                final = r2.url if r2.ok else u
-            out.append(final)
-        except Exception:
-            out.append(u)
+    pending = []
+    for i, u in enumerate(urls):
+        decoded = unwrap_search_url(u)
+        out.append(decoded)
+        if decoded != u and not is_search_redirect(decoded):
+            continue
+        if wrapped_only and not is_search_redirect(decoded):
+            continue
+        pending.append(i)
+    futures = {}
+    executor = None
+    if pending:
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending))))
+        # spread hosts over the queue so workers are not all stuck behind one throttled host
+        by_url = {}
+        for i in pending:
+            by_url.setdefault(out[i], []).append(i)
+        order = politeness.interleave_by_host(list(by_url))
+        futures = {executor.submit(_resolve_one, u, timeout, deadline): by_url[u] for u in order}
+    try:
+        for fut in as_completed(futures, timeout=max(0.0, deadline - time.monotonic())):
+            try:
+                final = fut.result()
+            except Exception:
+                continue
+            for i in futures[fut]:
+                out[i] = final
+    except FuturesTimeout:
+        pass
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
     # dedupe preserving order
     seen = set(); res = []
     for v in out:
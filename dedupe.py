@@ -0,0 +1,100 @@
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from url_utils import canonical_url
+
+# Duplicate detection for search results. URL variants of one article (tracking parameters, AMP,
+# www./m. hosts) are merged by canonical_url before anything is downloaded; after extraction,
+# pages that declare the same <link rel="canonical"> or whose text SimHash fingerprints differ in
+# at most MAX_DISTANCE of 64 bits (syndicated copies, mirrors) are merged too. Only one
+# representative per group (its earliest search result) is scored and passed on to the LLM stages.
+
+MAX_DISTANCE = int(os.getenv("DEDUPE_MAX_DISTANCE", "3"))
+SHINGLE_WORDS = 3
+# Below this many words a fingerprint says little; such pages are only merged on URLs.
+MIN_WORDS = int(os.getenv("DEDUPE_MIN_WORDS", "40"))
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_BITS = 64
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of the word 3-shingles of `text` (0 for texts shorter than one shingle)."""
+    words = _WORD_RE.findall((text or "").lower())
+    if len(words) < SHINGLE_WORDS:
+        return 0
+    counts = {}
+    for i in range(len(words) - SHINGLE_WORDS + 1):
+        shingle = " ".join(words[i:i + SHINGLE_WORDS])
+        counts[shingle] = counts.get(shingle, 0) + 1
+    weights = [0] * _BITS
+    for shingle, count in counts.items():
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(_BITS):
+            weights[bit] += count if h >> bit & 1 else -count
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def dedupe_urls(urls: List[str]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Keep the first URL per canonical_url; return (unique urls, {kept url: [dropped variants]})."""
+    first = {}
+    unique = []
+    aliases = {}
+    for url in urls:
+        key = canonical_url(url)
+        if key in first:
+            if url != first[key]:
+                aliases.setdefault(first[key], []).append(url)
+            continue
+        first[key] = url
+        unique.append(url)
+    return unique, aliases
+
+
+def _page_keys(url: str, page: Optional[dict]) -> Tuple[str, Optional[int]]:
+    """(canonical key from <link rel=canonical>, SimHash) of a fetched page; "" / None if unusable."""
+    page = page or {}
+    text = page.get("text", "")
+    if not text:
+        return "", None
+    declared = page.get("canonical", "")
+    key = canonical_url(urljoin(url, declared)) if declared else ""
+    fp = simhash(text) if len(text.split()) >= MIN_WORDS else None
+    return key, fp
+
+
+class DuplicateIndex:
+    """Groups near-duplicate pages as they arrive one at a time.
+
+    add() returns the id of the group an earlier page started that the new one duplicates, or
+    None if it starts a group of its own (its id is then the group's id). Which page of a group
+    represents it is up to the caller. Groups are never merged after the fact.
+    """
+
+    def __init__(self):
+        self._by_canonical = {}
+        self._fingerprints = []  # (representative id, fingerprint)
+
+    def add(self, page_id, url: str, page: Optional[dict]):
+        key, fp = _page_keys(url, page)
+        rep = self._by_canonical.get(key) if key else None
+        if rep is None and fp is not None:
+            rep = next((r for r, other in self._fingerprints if hamming(fp, other) <= MAX_DISTANCE), None)
+        if key or fp is not None:
+            own = page_id if rep is None else rep
+            if key:
+                self._by_canonical.setdefault(key, own)
+            if fp is not None:
+                self._fingerprints.append((own, fp))
+        return rep
@@ -0,0 +1,445 @@
+import functools
+import json
+import re
+from html.parser import HTMLParser
+from typing import Optional
+
+import html_parser
+
+# Readability-style main-content extraction in a single pass over the document. Text is
+# collected per block (p, h1-h6, li, ...) together with the chain of containers it sits in;
+# each block then scores its enclosing containers by text length and comma count (decaying with
+# distance), the best container is picked after discounting its link density, and only the
+# blocks inside it are returned. Non-content tags (script, nav, footer, aside, ...) are dropped
+# while walking. class/id hints only weigh the score, as in readability: a container hinted as
+# content ("post-body", "article") gets a bonus, one hinted as boilerplate (comments, sidebars,
+# share bars, widgets, ...) a penalty and its text does not score the containers around it;
+# boilerplate nested inside the chosen container is left out of the text. Boilerplate that
+# wraps the content (Blogger's <div class="widget Blog">) is never dropped.
+# The pass walks the selectolax tree from html_parser when selectolax is the parser backend,
+# else the stdlib tokenizer's events (about 3x slower); both give the same result.
+# bench_extract.py compares speed and output size with the old "<article>/<main>/page + all
+# p/h1/h2/h3" approach.
+
+# Bump when extract() output changes for the same HTML (invalidates the analysis cache).
+VERSION = "3"
+
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "form", "button", "select", "nav", "footer", "aside"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+_TEXT_BLOCKS = {"p", "h1", "h2", "h3", "h4", "h5", "h6", "li", "blockquote", "pre", "td", "th", "dd", "dt", "figcaption"}
+_HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+_CONTAINERS = {"body", "article", "main", "section", "div", "td", "ul", "ol", "blockquote"}
+# Starting one of these closes an open <p> (HTML's implied end tag).
+_CLOSES_P = {"p", "div", "section", "article", "main", "ul", "ol", "table", "blockquote", "pre", "h1", "h2", "h3", "h4", "h5", "h6", "header", "figure"}
+
+_NEGATIVE = re.compile(
+    r"comment|cookie|consent|banner|breaking|footer|sidebar|share|social|related|promo|advert|sponsor|"
+    r"newsletter|subscribe|breadcrumb|pagination|login|signin|menu|topbar|most-read|popular|widget|tags|byline|meta",
+    re.I,
+)
+_POSITIVE = re.compile(r"article|content|post|entry|story|body|main|text|thread", re.I)
+_HINT_WEIGHT = 25.0
+
+_MIN_BLOCK_CHARS = 25
+_MAX_LINK_DENSITY = 0.5
+_SCORE_LEVELS = 5
+_TOP_CANDIDATES = 5
+_MIN_SHARED_CANDIDATES = 3
+
+
+@functools.lru_cache(maxsize=4096)
+def _hint_of(value: str) -> tuple:
+    """(negative, positive) for a class or id attribute value. Each class name is one token; a
+    token like "comment-body" that matches both patterns only counts as negative. Cached: the
+    same class strings repeat all over a page."""
+    negative = positive = False
+    for token in value.split():
+        if _NEGATIVE.search(token):
+            negative = True
+        elif _POSITIVE.search(token):
+            positive = True
+    return negative, positive
+
+
+def _hint(attrs: dict) -> tuple:
+    """(negative, positive) for an element's class and id."""
+    class_negative, class_positive = _hint_of(attrs.get("class") or "")
+    id_negative, id_positive = _hint_of(attrs.get("id") or "")
+    return class_negative or id_negative, class_positive or id_positive
+
+
+class _Walker(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []        # open elements: (tag, node_id, skip)
+        self.skip_depth = 0    # > 0 while inside non-content tags
+        self.next_id = 0
+        self.bonus = {}        # container id -> class/id bonus (negative for boilerplate hints)
+        self.ancestors = {}    # container id -> enclosing container ids, outermost first
+        self.boilerplate = {}  # id of an element hinted as boilerplate -> enclosing container ids
+        self.blocks = []       # (text, link_chars, tag, container ids outermost..innermost, boilerplate ids)
+        self._open_containers = []   # ids of the open containers / boilerplate elements / <p>s,
+        self._open_boilerplate = []  # kept alongside the stack so no event has to scan it
+        self._open_p = 0
+        self._buf = []
+        self._link_chars = 0
+        self._in_link = 0
+        self._in_title = False
+        self._ld_json = None
+        self.meta = {}
+        self.title_tag = ""
+        self.first_h1 = ""
+        self.first_time = ""
+        self.rel_author = ""
+        self._in_rel_author = False
+        self.canonical = ""
+
+    # -- helpers -------------------------------------------------------------
+    def _containers(self) -> tuple:
+        return tuple(self._open_containers)
+
+    def _flush(self, tag: str) -> None:
+        text = " ".join("".join(self._buf).split())
+        if text:
+            self.blocks.append((text, self._link_chars, tag, self._containers(), tuple(self._open_boilerplate)))
+            if tag == "h1" and not self.first_h1:
+                self.first_h1 = text
+        self._buf = []
+        self._link_chars = 0
+
+    def _pop_to(self, tag: str) -> None:
+        while self.stack:
+            open_tag, node_id, skip = self.stack[-1]
+            # flush before popping so the block is still inside the element's boilerplate hint
+            if open_tag in _TEXT_BLOCKS or open_tag in _CONTAINERS:
+                self._flush(open_tag)
+            self.stack.pop()
+            if open_tag in _CONTAINERS:
+                self._open_containers.pop()
+            if self._open_boilerplate and self._open_boilerplate[-1] == node_id:
+                self._open_boilerplate.pop()
+            if open_tag == "p":
+                self._open_p -= 1
+            if skip:
+                self.skip_depth -= 1
+            if open_tag == "a":
+                self._in_link = max(0, self._in_link - 1)
+            if open_tag == tag:
+                return
+
+    # -- tokenizer callbacks ----------------------------------------------------
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "meta":
+            key = (attrs.get("property") or attrs.get("name") or attrs.get("itemprop") or "").lower()
+            if key and attrs.get("content"):
+                self.meta.setdefault(key, attrs["content"].strip())
+            return
+        if tag == "title":
+            self._in_title = True
+            return
+        if tag == "link":
+            if not self.canonical and "canonical" in (attrs.get("rel") or "").lower().split():
+                self.canonical = (attrs.get("href") or "").strip()
+            return
+        if tag == "script":
+            if (attrs.get("type") or "").lower() == "application/ld+json":
+                self._ld_json = []
+        if tag == "time" and not self.first_time and attrs.get("datetime"):
+            self.first_time = attrs["datetime"].strip()
+        if tag == "a" and "author" in (attrs.get("rel") or "").lower().split():
+            self._in_rel_author = True
+        if tag in _VOID_TAGS:
+            if tag == "br" and not self.skip_depth:
+                self._buf.append(" ")
+            return
+        if tag in _CLOSES_P and self._open_p:
+            self._pop_to("p")
+        if tag == "li" and self.stack and any(t == "li" for t, _, _ in self.stack[-2:]):
+            self._pop_to("li")
+        # text written directly inside a container becomes its own block
+        if (tag in _TEXT_BLOCKS or tag in _CONTAINERS) and self._buf:
+            parent = self.stack[-1][0] if self.stack else "body"
+            self._flush(parent)
+        skip = tag in _SKIP_TAGS
+        node_id = self.next_id
+        self.next_id += 1
+        negative, positive = _hint(attrs) if tag not in ("body", "html") else (False, False)
+        if negative and not positive and tag not in ("article", "main"):
+            self.boilerplate[node_id] = self._containers()
+            self._open_boilerplate.append(node_id)
+        if tag in _CONTAINERS:
+            bonus = 0.0
+            if positive:
+                bonus += _HINT_WEIGHT
+            if negative:
+                bonus -= _HINT_WEIGHT
+            if tag in ("article", "main"):
+                bonus += _HINT_WEIGHT
+            self.bonus[node_id] = bonus
+            self.ancestors[node_id] = self._containers()
+            self._open_containers.append(node_id)
+        if tag == "p":
+            self._open_p += 1
+        self.stack.append((tag, node_id, skip))
+        if skip:
+            self.skip_depth += 1
+        if tag == "a":
+            self._in_link += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS and self.stack and self.stack[-1][0] == tag:
+            self._pop_to(tag)
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+            return
+        if tag == "script" and self._ld_json is not None:
+            self.meta.setdefault("_ld_json", "".join(self._ld_json))
+            self._ld_json = None
+        if tag == "a":
+            self._in_rel_author = False
+        if self.stack and self.stack[-1][0] == tag or any(t == tag for t, _, _ in self.stack):
+            self._pop_to(tag)
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title_tag += data
+            return
+        if self._ld_json is not None:
+            self._ld_json.append(data)
+            return
+        if self._in_rel_author and not self.rel_author:
+            self.rel_author = data.strip()
+        if self.skip_depth:
+            return
+        self._buf.append(data)
+        if self._in_link:
+            self._link_chars += len(data.strip())
+
+    def close(self):
+        super().close()
+        self._pop_to("")
+
+
+def _walk_tree(tree, w: _Walker) -> None:
+    """Fill `w` from a parsed selectolax tree instead of feeding it the HTML: the same blocks,
+    class/id hints and metadata, without the pure-Python tokenizer. The tree is already
+    well-formed, so there is no implied-end-tag bookkeeping; element ends are found from each
+    node's parent during one traverse()."""
+    meta = w.meta
+    for node in tree.css("meta"):
+        attrs = node.attributes
+        key = (attrs.get("property") or attrs.get("name") or attrs.get("itemprop") or "").lower()
+        if key and attrs.get("content"):
+            meta.setdefault(key, attrs["content"].strip())
+    title = tree.css_first("title")
+    w.title_tag = title.text() if title is not None else ""
+    for node in tree.css("link[rel]"):
+        if "canonical" in (node.attributes.get("rel") or "").lower().split():
+            w.canonical = (node.attributes.get("href") or "").strip()
+            break
+    for node in tree.css("script[type]"):
+        if (node.attributes.get("type") or "").lower() == "application/ld+json":
+            meta.setdefault("_ld_json", node.text())
+            break
+    node = tree.css_first("time[datetime]")
+    if node is not None:
+        w.first_time = (node.attributes.get("datetime") or "").strip()
+    for node in tree.css("a[rel]"):
+        if "author" in (node.attributes.get("rel") or "").lower().split():
+            w.rel_author = node.text(strip=True)
+            break
+
+    body = tree.body
+    if body is None:
+        return
+    blocks = w.blocks
+    buf = []
+    links = 0
+    containers, hinted = w._open_containers, w._open_boilerplate
+    open_elements = []  # (mem_id, tag, node_id, skip) of elements not yet closed
+    skip = in_link = 0
+    next_id = 0
+
+    def flush(tag: str) -> None:
+        nonlocal links
+        text = " ".join("".join(buf).split())
+        if text:
+            blocks.append((text, links, tag, tuple(containers), tuple(hinted)))
+            if tag == "h1" and not w.first_h1:
+                w.first_h1 = text
+        buf.clear()
+        links = 0
+
+    def close() -> None:
+        nonlocal skip, in_link
+        _, tag, node_id, is_skip = open_elements.pop()
+        if buf and (tag in _TEXT_BLOCKS or tag in _CONTAINERS):
+            flush(tag)
+        if tag in _CONTAINERS:
+            containers.pop()
+        if hinted and hinted[-1] == node_id:
+            hinted.pop()
+        if is_skip:
+            skip -= 1
+        if tag == "a":
+            in_link -= 1
+
+    for node in body.traverse(include_text=True):
+        parent = node.parent
+        parent_id = parent.mem_id if parent is not None else None
+        while open_elements and open_elements[-1][0] != parent_id:
+            close()
+        tag = node.tag
+        if tag == "-text":
+            if not skip:
+                text = node.text_content
+                if text:
+                    buf.append(text)
+                    if in_link:
+                        links += len(text.strip())
+            continue
+        if tag[0] == "-":
+            continue
+        if tag in _VOID_TAGS:
+            if tag == "br" and not skip:
+                buf.append(" ")
+            continue
+        # text written directly inside a container becomes its own block
+        if buf and (tag in _TEXT_BLOCKS or tag in _CONTAINERS):
+            flush(open_elements[-1][1] if open_elements else "body")
+        node_id = next_id
+        next_id += 1
+        attrs = node.attributes
+        negative, positive = _hint(attrs) if attrs and tag != "body" else (False, False)
+        if negative and not positive and tag not in ("article", "main"):
+            w.boilerplate[node_id] = tuple(containers)
+            hinted.append(node_id)
+        if tag in _CONTAINERS:
+            w.bonus[node_id] = (
+                (_HINT_WEIGHT if positive else 0.0) - (_HINT_WEIGHT if negative else 0.0)
+                + (_HINT_WEIGHT if tag in ("article", "main") else 0.0)
+            )
+            w.ancestors[node_id] = tuple(containers)
+            containers.append(node_id)
+        is_skip = tag in _SKIP_TAGS
+        open_elements.append((node.mem_id, tag, node_id, is_skip))
+        if is_skip:
+            skip += 1
+        if tag == "a":
+            in_link += 1
+    while open_elements:
+        close()
+
+
+def _ld_json_field(raw: str, field: str) -> str:
+    if not raw:
+        return ""
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return ""
+    for item in data if isinstance(data, list) else [data]:
+        if not isinstance(item, dict):
+            continue
+        value = item.get(field)
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if isinstance(value, dict):
+            value = value.get("name")
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return ""
+
+
+def _pick_container(blocks: list, bonus: dict, ancestors: dict, boilerplate: dict) -> Optional[int]:
+    scores = {}
+    text_chars = {}
+    link_chars = {}
+    for text, links, tag, containers, hinted in blocks:
+        if hinted:
+            # boilerplate only counts towards containers inside its outermost hinted element
+            containers = containers[len(boilerplate[hinted[0]]):]
+        for cid in containers:
+            text_chars[cid] = text_chars.get(cid, 0) + len(text)
+            link_chars[cid] = link_chars.get(cid, 0) + links
+        if len(text) < _MIN_BLOCK_CHARS or not containers:
+            continue
+        score = 1.0 + text.count(",") + min(len(text) / 100.0, 3.0)
+        # parent gets the full score, grandparent half, further ancestors score / (level * 3)
+        for level, cid in enumerate(reversed(containers[-_SCORE_LEVELS:])):
+            divider = 1 if level == 0 else 2 if level == 1 else level * 3
+            scores[cid] = scores.get(cid, bonus.get(cid, 0.0)) + score / divider
+
+    final = {}
+    for cid, score in scores.items():
+        density = link_chars.get(cid, 0) / max(1, text_chars.get(cid, 0))
+        final[cid] = score * (1.0 - density)
+    if not final:
+        return None
+    ranked = sorted(final, key=final.get, reverse=True)
+    best = ranked[0]
+    # Content split over sibling blocks (forum posts, paged sections) shows up as several strong
+    # candidates under one ancestor: promote to the closest ancestor shared by enough of them.
+    close = [cid for cid in ranked[1:_TOP_CANDIDATES] if final[cid] >= 0.75 * final[best]]
+    if len(close) >= _MIN_SHARED_CANDIDATES:
+        for ancestor in reversed(ancestors.get(best, ())):
+            shared = sum(1 for cid in close if ancestor in ancestors.get(cid, ()))
+            if shared >= _MIN_SHARED_CANDIDATES:
+                best = ancestor
+                break
+    return best
+
+
+def extract(html: str, backend: Optional[str] = None) -> dict:
+    """Extract the main content of an article page.
+
+    Returns {text, title, author, published, canonical}; missing fields are "".
+    `canonical` is the page's <link rel="canonical"> href as written (possibly relative).
+    `backend` is an html_parser backend name (default: the fastest installed); only
+    "selectolax" walks a parsed tree, any other uses the stdlib tokenizer.
+    """
+    walker = _Walker()
+    try:
+        if (backend or html_parser.default_backend()) == "selectolax" and "selectolax" in html_parser.available_backends():
+            _walk_tree(html_parser.parse(html or "", "selectolax").tree, walker)
+        else:
+            walker.feed(html or "")
+            walker.close()
+    except Exception:
+        pass
+
+    best = _pick_container(walker.blocks, walker.bonus, walker.ancestors, walker.boilerplate)
+    parts = []
+    if best is not None:
+        for text, links, tag, containers, boilerplate in walker.blocks:
+            if best not in containers:
+                continue
+            # comments, share bars, ... inside the content; a boilerplate-hinted wrapper of it stays
+            if any(best in walker.boilerplate[node_id] for node_id in boilerplate):
+                continue
+            if tag not in _HEADINGS and links / max(1, len(text)) > _MAX_LINK_DENSITY:
+                continue
+            parts.append(text)
+
+    meta = walker.meta
+    ld_json = meta.get("_ld_json", "")
+    title = meta.get("og:title") or _ld_json_field(ld_json, "headline") or walker.first_h1 or " ".join(walker.title_tag.split())
+    author = (
+        meta.get("author") or meta.get("article:author") or _ld_json_field(ld_json, "author")
+        or meta.get("byline") or walker.rel_author
+    )
+    published = (
+        meta.get("article:published_time") or meta.get("datepublished") or meta.get("date")
+        or _ld_json_field(ld_json, "datePublished") or walker.first_time
+    )
+    return {
+        "text": " ".join(parts).strip(),
+        "title": title,
+        "author": author,
+        "published": published,
+        "canonical": walker.canonical,
+    }
@@ -0,0 +1,189 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import resilience
+
+# Global cap on in-flight downloads and cap per host (so one site with many results
+# does not get hammered while the others wait).
+DEFAULT_CONCURRENCY = 10
+DEFAULT_PER_HOST = 2
+# Threads for robots.txt lookups. They get their own pool: every task asks for robots.txt
+# first, and on the download pool those lookups would all queue ahead of the first download.
+ROBOTS_CONCURRENCY = 10
+
+
+class Deadline:
+    """Wall-clock budget shared by the stages of one analysis (None = unbounded)."""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = None if seconds is None else time.monotonic() + float(seconds)
+
+    def remaining(self, cap: Optional[float] = None) -> Optional[float]:
+        """Seconds left (never negative), optionally capped; None when unbounded and uncapped."""
+        if self.expires_at is None:
+            return cap
+        left = max(0.0, self.expires_at - time.monotonic())
+        return left if cap is None else min(cap, left)
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+
+def _host_of(url: str) -> str:
+    try:
+        return urlparse(url).netloc.lower()
+    except Exception:
+        return ""
+
+
+async def fetch_all_async(
+    urls: List[str],
+    fetch: Callable[[str], Any],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    scheduler=None,
+    is_local: Optional[Callable[[str], bool]] = None,
+    on_failure: Optional[Callable[[str, str], Any]] = None,
+    deadline: Optional[float] = None,
+    on_result: Optional[Callable[[int, Any], None]] = None,
+) -> list:
+    """Run the blocking `fetch(url)` for every URL concurrently and return results in input order.
+
+    Each call runs on a worker thread. A task first waits for a slot on its host, then (with a
+    politeness `scheduler`) for robots.txt clearance and the host's rate limit, and only then for
+    a global slot, so a throttled host never holds global slots other hosts could use.
+    URLs for which `is_local(url)` is true (e.g. fresh in the page cache) skip the scheduler.
+    URLs disallowed by robots.txt and calls where `fetch` raises get `on_failure(url, reason)`
+    as their result ("" when no `on_failure` is given). After `deadline` seconds, fetches still
+    pending are cancelled and reported as resilience.SKIPPED; results collected so far are kept.
+    `on_result(index, result)` is called for every URL as soon as its result is known.
+    """
+    if not urls:
+        return []
+    concurrency = max(1, int(concurrency))
+    per_host = max(1, int(per_host))
+    loop = asyncio.get_running_loop()
+    global_sem = asyncio.Semaphore(concurrency)
+    host_sems = {}
+
+    def _failed(url: str, reason: str) -> Any:
+        return on_failure(url, reason) if on_failure is not None else ""
+
+    async def _one(url: str, pool: ThreadPoolExecutor) -> Any:
+        host_sem = host_sems.setdefault(_host_of(url), asyncio.Semaphore(per_host))
+        async with host_sem:
+            if scheduler is not None and not (is_local is not None and is_local(url)):
+                if not await scheduler.wait_async(url, robots_pool):
+                    return _failed(url, resilience.BLOCKED)
+            async with global_sem:
+                try:
+                    return await loop.run_in_executor(pool, fetch, url)
+                except Exception as e:
+                    return _failed(url, resilience.classify(e))
+
+    reported = set()
+
+    async def _report(index: int, url: str, pool: ThreadPoolExecutor) -> Any:
+        result = await _one(url, pool)
+        if on_result is not None:
+            reported.add(index)
+            on_result(index, result)
+        return result
+
+    pool = ThreadPoolExecutor(max_workers=min(concurrency, len(urls)))
+    # robots.txt lookups run on their own threads, so hosts already cleared can download while
+    # the lookups for other hosts are still queued
+    robots_pool = ThreadPoolExecutor(max_workers=min(ROBOTS_CONCURRENCY, len(urls)))
+    tasks = [asyncio.ensure_future(_report(i, u, pool)) for i, u in enumerate(urls)]
+    try:
+        await asyncio.wait(tasks, timeout=deadline)
+    finally:
+        for task in tasks:
+            task.cancel()
+        # running downloads cannot be interrupted; let them finish in the background
+        pool.shutdown(wait=False, cancel_futures=True)
+        robots_pool.shutdown(wait=False, cancel_futures=True)
+    results = []
+    for i, (u, t) in enumerate(zip(urls, tasks)):
+        if t.done() and not t.cancelled():
+            results.append(t.result())
+            continue
+        results.append(_failed(u, resilience.SKIPPED))
+        if on_result is not None and i not in reported:
+            on_result(i, results[-1])
+    return results
+
+
+def fetch_all(
+    urls: List[str],
+    fetch: Callable[[str], Any],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    scheduler=None,
+    is_local: Optional[Callable[[str], bool]] = None,
+    on_failure: Optional[Callable[[str, str], Any]] = None,
+    deadline: Optional[float] = None,
+) -> list:
+    """Synchronous wrapper around `fetch_all_async` for callers without an event loop (e.g. Streamlit)."""
+    coro = fetch_all_async(urls, fetch, concurrency=concurrency, per_host=per_host, scheduler=scheduler, is_local=is_local, on_failure=on_failure, deadline=deadline)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Called from inside a running loop: drive our own loop on a helper thread instead.
+    with ThreadPoolExecutor(max_workers=1) as helper:
+        return helper.submit(asyncio.run, coro).result()
+
+
+def iter_fetch(
+    urls: List[str],
+    fetch: Callable[[str], Any],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    scheduler=None,
+    is_local: Optional[Callable[[str], bool]] = None,
+    on_failure: Optional[Callable[[str, str], Any]] = None,
+    deadline: Optional[float] = None,
+) -> Iterator[List[Tuple[int, Any]]]:
+    """Like `fetch_all`, but yields results in completion order as they finish.
+
+    Each item is a non-empty list of (index, result) pairs: everything that completed since the
+    previous item, so a consumer can process results in batches without waiting for the slowest
+    URL. The fetches run on a background thread, so a slow consumer does not hold them up.
+    """
+    if not urls:
+        return
+    done = queue.Queue()
+    coro = fetch_all_async(
+        urls, fetch, concurrency=concurrency, per_host=per_host, scheduler=scheduler, is_local=is_local,
+        on_failure=on_failure, deadline=deadline, on_result=lambda i, result: done.put((i, result)),
+    )
+
+    def _run() -> None:
+        try:
+            asyncio.run(coro)
+        except Exception:
+            pass
+        done.put(None)  # every result is already queued; unblocks the consumer after a crash too
+
+    threading.Thread(target=_run, name="iter-fetch", daemon=True).start()
+    remaining = len(urls)
+    while remaining:
+        batch = [done.get()]
+        while True:
+            try:
+                batch.append(done.get_nowait())
+            except queue.Empty:
+                break
+        finished = None in batch
+        batch = [item for item in batch if item is not None]
+        remaining -= len(batch)
+        if batch:
+            yield batch
+        if finished:
+            return
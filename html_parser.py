@@ -0,0 +1,132 @@
+import os
+from typing import List, Optional
+
+from bs4 import BeautifulSoup
+
+# Pluggable HTML parsing for search-result pages and article pages.
+#
+# The fast path is selectolax (lexbor), then BeautifulSoup on lxml, with BeautifulSoup's
+# built-in "html.parser" as the always-available fallback. Every backend implements the same
+# three queries and gives identical output on well-formed pages (bench_parsers.py checks that
+# against the pages in fixtures/ and times each backend). On malformed markup they can differ:
+# selectolax and lxml close unclosed elements the way browsers do, while html.parser nests
+# them, so main_text() there can repeat text (an unclosed <p> contains everything after it).
+# bench_parsers.py also pins the expected output of both kinds on a few malformed snippets.
+#
+# HTML_PARSER_BACKEND=selectolax|lxml|html.parser pins a backend; the default picks the fastest
+# one installed.
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+    _HAVE_LXML = True
+except ImportError:
+    _HAVE_LXML = False
+
+TEXT_TAGS = ["p", "h1", "h2", "h3"]
+# BeautifulSoup's get_text() leaves out the contents of these elements.
+_NON_TEXT_PARENTS = {"script", "style", "template"}
+
+
+class _SoupDocument:
+    def __init__(self, html: str, parser: str):
+        self.backend = parser
+        self._soup = BeautifulSoup(html, parser)
+
+    def hrefs(self, selector: str) -> List[str]:
+        return [el.get("href") or "" for el in self._soup.select(selector)]
+
+    def first_hrefs(self, container_selector: str) -> List[str]:
+        out = []
+        for container in self._soup.select(container_selector):
+            a = container.find("a", href=True)
+            if a:
+                out.append(a["href"])
+        return out
+
+    def main_text(self) -> str:
+        root = self._soup.find("article") or self._soup.find("main") or self._soup
+        return " ".join(t.get_text(" ", strip=True) for t in root.find_all(TEXT_TAGS)).strip()
+
+
+class _SelectolaxDocument:
+    backend = "selectolax"
+
+    def __init__(self, html: str):
+        self._tree = LexborHTMLParser(html)
+
+    @property
+    def tree(self):
+        """The underlying selectolax (lexbor) parser, for callers that walk the tree themselves."""
+        return self._tree
+
+    def hrefs(self, selector: str) -> List[str]:
+        return [el.attributes.get("href") or "" for el in self._tree.css(selector)]
+
+    def first_hrefs(self, container_selector: str) -> List[str]:
+        out = []
+        for container in self._tree.css(container_selector):
+            a = container.css_first("a[href]")
+            if a is not None:
+                out.append(a.attributes.get("href") or "")
+        return out
+
+    @staticmethod
+    def _text(node) -> str:
+        # Same result as BeautifulSoup's get_text(" ", strip=True): stripped, non-empty text nodes
+        # joined by single spaces, skipping comments and script/style/template contents.
+        parts = []
+        for child in node.traverse(include_text=True):
+            if child.tag != "-text":
+                continue
+            parent = child.parent
+            if parent is not None and parent.tag in _NON_TEXT_PARENTS:
+                continue
+            text = (child.text_content or "").strip()
+            if text:
+                parts.append(text)
+        return " ".join(parts)
+
+    def main_text(self) -> str:
+        root = self._tree.css_first("article") or self._tree.css_first("main") or self._tree.root
+        if root is None:
+            return ""
+        return " ".join(self._text(t) for t in root.css(", ".join(TEXT_TAGS))).strip()
+
+
+def available_backends() -> List[str]:
+    backends = []
+    if LexborHTMLParser is not None:
+        backends.append("selectolax")
+    if _HAVE_LXML:
+        backends.append("lxml")
+    backends.append("html.parser")
+    return backends
+
+
+def default_backend() -> str:
+    pinned = os.getenv("HTML_PARSER_BACKEND", "").strip()
+    if pinned and pinned in available_backends():
+        return pinned
+    return available_backends()[0]
+
+
+def parse(html: str, backend: Optional[str] = None):
+    """Parse `html` with the given (or fastest available) backend.
+
+    The returned document supports:
+      - hrefs(selector): href of every element matching a CSS selector ("" when missing)
+      - first_hrefs(container_selector): href of the first <a href> inside each container
+      - main_text(): text of p/h1/h2/h3 inside <article>, else <main>, else the whole page
+    selectolax documents also expose the parsed tree as `.tree` (used by extractor.py).
+    """
+    backend = backend or default_backend()
+    if backend == "selectolax" and LexborHTMLParser is not None:
+        return _SelectolaxDocument(html)
+    if backend == "lxml" and _HAVE_LXML:
+        return _SoupDocument(html, "lxml")
+    return _SoupDocument(html, "html.parser")
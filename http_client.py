@@ -0,0 +1,224 @@
+import codecs
+import os
+import re
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
+
+import resilience
+
+load_dotenv()
+
+# Shared outbound HTTP client. Every module goes through one Session so repeated calls to the
+# same hosts (duckduckgo, bing, graph.facebook.com, ...) reuse keep-alive connections instead of
+# paying a new TCP+TLS handshake each time.
+
+USER_AGENT = os.getenv("HTTP_USER_AGENT", "CrewAI-Bot/1.0")
+# Bing serves a stripped-down page to bot user agents, so its search scraping keeps this one.
+BROWSER_USER_AGENT = "Mozilla/5.0"
+
+DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+
+# Number of per-host pools kept alive, and keep-alive connections per host.
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "20"))
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+
+# Page downloads are streamed and cut off after this many bytes.
+MAX_BODY_BYTES = int(os.getenv("HTTP_MAX_BODY_BYTES", str(2 * 1024 * 1024)))
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+_CHUNK_SIZE = 64 * 1024
+_META_SCAN_BYTES = 4096
+_DETECT_BYTES = 64 * 1024
+_CHARSET_RE = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.I)
+
+_session = None
+_lock = threading.Lock()
+
+
+def _accept_encoding() -> str:
+    """gzip/deflate always; br only when a brotli decoder is installed (urllib3 needs one)."""
+    for module in ("brotli", "brotlicffi"):
+        try:
+            __import__(module)
+            return "gzip, deflate, br"
+        except ImportError:
+            continue
+    return "gzip, deflate"
+
+
+def _build_session(pool_connections: int, pool_maxsize: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": _accept_encoding(),
+    })
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled Session (created on first use)."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _build_session(POOL_CONNECTIONS, POOL_MAXSIZE)
+        return _session
+
+
+def configure(pool_connections: Optional[int] = None, pool_maxsize: Optional[int] = None) -> requests.Session:
+    """Rebuild the shared Session with new pool sizes (existing connections are closed)."""
+    global _session, POOL_CONNECTIONS, POOL_MAXSIZE
+    with _lock:
+        if pool_connections is not None:
+            POOL_CONNECTIONS = int(pool_connections)
+        if pool_maxsize is not None:
+            POOL_MAXSIZE = int(pool_maxsize)
+        old, _session = _session, _build_session(POOL_CONNECTIONS, POOL_MAXSIZE)
+    if old is not None:
+        old.close()
+    return _session
+
+
+def _timeout(timeout):
+    """Apply the timeout policy: a single number is the read timeout, connect is capped at CONNECT_TIMEOUT."""
+    if timeout is None:
+        timeout = DEFAULT_TIMEOUT
+    if isinstance(timeout, (int, float)):
+        return (min(CONNECT_TIMEOUT, timeout), timeout)
+    return timeout
+
+
+def request(method: str, url: str, timeout=None, retries: Optional[int] = None, **kwargs) -> requests.Response:
+    """Send a request through the shared Session with the resilience policy applied.
+
+    Idempotent methods are retried up to `retries` times (resilience.MAX_RETRIES by default) on
+    connection errors, timeouts and retryable statuses, with jittered exponential backoff or the
+    server's Retry-After. Requests to a host whose circuit is open fail immediately with
+    resilience.CircuitOpenError.
+    """
+    host = urlparse(url).netloc.lower()
+    breaker = resilience.get_breaker()
+    breaker.before_request(host)
+    if method.upper() not in resilience.IDEMPOTENT_METHODS:
+        retries = 0
+    elif retries is None:
+        retries = resilience.MAX_RETRIES
+    # One breaker outcome per call, after retries: a failure if the last attempt hit a
+    # connection error, a timeout, a 5xx or a 429; 401/403/451 and anything else raised
+    # (redirect loop, bad URL, ...) say nothing about the host and only end a half-open probe.
+    failed = None
+    try:
+        for attempt in range(retries + 1):
+            last = attempt == retries
+            try:
+                resp = get_session().request(method, url, timeout=_timeout(timeout), **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if last:
+                    failed = True
+                    raise
+                time.sleep(resilience.backoff_delay(attempt))
+                continue
+            if resp.status_code in resilience.RETRY_STATUSES and not last:
+                delay = resilience.retry_after(resp)
+                if delay is None:
+                    delay = resilience.backoff_delay(attempt)
+                if delay <= resilience.MAX_RETRY_AFTER:
+                    resp.close()
+                    time.sleep(delay)
+                    continue
+            if resp.status_code >= 500 or resp.status_code in resilience.HOST_FAILURE_STATUSES:
+                failed = True
+            elif resp.status_code not in resilience.NEUTRAL_STATUSES:
+                failed = False
+            return resp
+    finally:
+        if failed is None:
+            breaker.release(host)
+        elif failed:
+            breaker.record_failure(host)
+        else:
+            breaker.record_success(host)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def head(url: str, **kwargs) -> requests.Response:
+    return request("HEAD", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def is_html(content_type: str) -> bool:
+    """True for HTML content types. A missing Content-Type is given the benefit of the doubt."""
+    mime = (content_type or "").split(";")[0].strip().lower()
+    return not mime or mime in HTML_CONTENT_TYPES
+
+
+def read_capped(resp: requests.Response, max_bytes: Optional[int] = None) -> bytes:
+    """Read a streamed response body, stopping after `max_bytes` (MAX_BODY_BYTES by default)."""
+    max_bytes = MAX_BODY_BYTES if max_bytes is None else max_bytes
+    chunks = []
+    total = 0
+    try:
+        for chunk in resp.iter_content(chunk_size=_CHUNK_SIZE):
+            chunk = chunk[:max_bytes - total]
+            chunks.append(chunk)
+            total += len(chunk)
+            if total >= max_bytes:
+                break
+    finally:
+        resp.close()
+    return b"".join(chunks)
+
+
+def _valid_codec(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def _is_utf8(body: bytes) -> bool:
+    try:
+        body.decode("utf-8")
+        return True
+    except UnicodeDecodeError as e:
+        # a body cut at the byte cap may end mid-character
+        return e.start >= len(body) - 3 and e.reason == "unexpected end of data"
+
+
+def decode_body(body: bytes, content_type: str = "") -> str:
+    """Decode an HTML body: Content-Type charset, then <meta> charset, then UTF-8, then detection."""
+    match = _CHARSET_RE.search(content_type or "")
+    charset = _valid_codec(match.group(1) if match else None)
+    if charset is None:
+        meta = _META_CHARSET_RE.search(body[:_META_SCAN_BYTES])
+        charset = _valid_codec(meta.group(1).decode("ascii", "ignore") if meta else None)
+    if charset is None:
+        if _is_utf8(body):
+            charset = "utf-8"
+        elif charset_normalizer is not None:
+            best = charset_normalizer.from_bytes(body[:_DETECT_BYTES]).best()
+            charset = _valid_codec(best.encoding if best else None)
+    return body.decode(charset or "utf-8", errors="replace")
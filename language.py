@@ -0,0 +1,80 @@
+import os
+import threading
+from typing import Iterable, Optional, Tuple
+
+from langdetect.detector_factory import DetectorFactory, PROFILES_DIRECTORY
+from langdetect.lang_detect_exception import LangDetectException
+
+# Language detection for extracted pages, run before scoring so pages outside TARGET_LANGUAGES
+# are dropped before any sentiment or LLM work is spent on them (the lexicon is English-only).
+# The detector profiles (~50 languages, a few MB of n-gram tables) are loaded once per process;
+# each document is classified on its first PREFIX_CHARS characters only, and the sampler is
+# seeded so the same text always gets the same answer.
+
+VERSION = "1"
+PREFIX_CHARS = int(os.getenv("LANGDETECT_PREFIX_CHARS", "2000"))
+# Below this many characters (or probability) the guess is unreliable; the page is kept as "".
+MIN_CHARS = int(os.getenv("LANGDETECT_MIN_CHARS", "40"))
+MIN_PROBABILITY = float(os.getenv("LANGDETECT_MIN_PROBABILITY", "0.6"))
+SEED = 0
+
+
+def parse_languages(value: str) -> Tuple[str, ...]:
+    """"en, de" -> ("en", "de"); an empty string means no filter."""
+    return tuple(code.strip().lower() for code in (value or "").split(",") if code.strip())
+
+
+TARGET_LANGUAGES = parse_languages(os.getenv("TARGET_LANGUAGES", "en"))
+
+_factory = None
+_factory_lock = threading.Lock()
+
+
+def get_factory() -> DetectorFactory:
+    """Return the process-wide detector factory, loading the language profiles on first use."""
+    global _factory
+    with _factory_lock:
+        if _factory is None:
+            factory = DetectorFactory()
+            factory.load_profile(PROFILES_DIRECTORY)
+            factory.set_seed(SEED)
+            _factory = factory
+        return _factory
+
+
+def _prefix(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > limit // 2 else limit]
+
+
+def detect(text: str, prefix_chars: int = PREFIX_CHARS) -> Tuple[str, float]:
+    """(language code, probability) of `text`, judged on its first `prefix_chars` characters.
+
+    Returns ("", 0.0) when the text is too short or no language is likely enough.
+    """
+    sample = _prefix((text or "").strip(), prefix_chars)
+    if len(sample) < MIN_CHARS:
+        return "", 0.0
+    detector = get_factory().create()
+    detector.set_max_text_length(prefix_chars)
+    detector.append(sample)
+    try:
+        best = detector.get_probabilities()[0]
+    except (LangDetectException, IndexError):
+        return "", 0.0
+    if best.prob < MIN_PROBABILITY:
+        return "", round(best.prob, 3)
+    return best.lang, round(best.prob, 3)
+
+
+def is_target(lang: str, targets: Optional[Iterable[str]] = None) -> bool:
+    """True if `lang` passes the filter; unknown languages ("") and an empty filter always pass.
+
+    A target without region matches regional codes too ("zh" matches "zh-cn").
+    """
+    targets = TARGET_LANGUAGES if targets is None else tuple(targets)
+    if not targets or not lang:
+        return True
+    return lang in targets or lang.split("-")[0] in targets
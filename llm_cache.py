@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, Generation
+
+import sqlite_store
+
+# Exact-match cache of LLM responses, plugged into every ChatOpenAI client built by
+# llm_provider. LangChain hands the cache the serialized messages (the agent's role/backstory
+# system text plus the task prompt) and a string of the call parameters (model, temperature,
+# stop words, ...); a repeat of the same call within DEFAULT_TTL is answered from disk without a
+# request. Responses are stored with the tokens they cost, so hits can be reported as tokens
+# saved. The file is trimmed (expired entries first, then least recently used) past max_bytes
+# by sqlite_store.
+# Set LLM_CACHE_PATH to an empty string to disable the cache.
+
+DEFAULT_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm.sqlite3"))
+DEFAULT_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def _key(prompt: str, llm_string: str) -> str:
+    return hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8", "replace")).hexdigest()
+
+
+def _encode(generations: list) -> Optional[list]:
+    """Plain-text generations as JSON-able dicts; None if any carries tool calls (not cached)."""
+    out = []
+    for gen in generations:
+        message = getattr(gen, "message", None)
+        if message is None:
+            out.append({"text": gen.text})
+        elif getattr(message, "tool_calls", None) or message.additional_kwargs.get("function_call"):
+            return None
+        else:
+            out.append({"text": gen.text, "content": message.content, "chat": True})
+    return out
+
+
+def _decode(data: list) -> list:
+    return [
+        ChatGeneration(message=AIMessage(content=item["content"])) if item.get("chat") else Generation(text=item["text"])
+        for item in data
+    ]
+
+
+def _tokens(generations: list) -> int:
+    total = 0
+    for gen in generations:
+        usage = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+        total += usage.get("total_tokens", 0)
+    return total
+
+
+class LLMCache(sqlite_store.SQLiteStore, BaseCache):
+    """SQLite-backed LangChain cache with a TTL and a size cap."""
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(path, "responses", _SCHEMA, max_bytes, ("hits", "misses", "saved_tokens"))
+        self.ttl = ttl
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[list]:
+        key = _key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT data, tokens, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[2] >= self.ttl:
+                self.stats["misses"] += 1
+                return None
+            self._touch(key, now)
+            self.stats["hits"] += 1
+            self.stats["saved_tokens"] += row[1]
+        try:
+            return _decode(json.loads(row[0]))
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: list) -> None:
+        data = _encode(return_val)
+        if not data:
+            return
+        blob = json.dumps(data, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            # expired entries go first, before anything still usable is trimmed
+            self._delete_where("stored_at <= ?", (now - self.ttl,))
+            self._store({
+                "key": _key(prompt, llm_string), "data": blob, "tokens": _tokens(return_val),
+                "stored_at": now, "accessed_at": now, "size": len(blob),
+            })
+
+
+_default_cache = sqlite_store.Singleton(LLMCache)
+
+
+def get_default_cache() -> Optional[LLMCache]:
+    """Return the process-wide LLM response cache, or None when LLM_CACHE_PATH is empty."""
+    if not DEFAULT_PATH:
+        return None
+    return _default_cache.get()
+
+
+def cache_stats() -> dict:
+    """Hits, misses and tokens saved by the default cache since process start."""
+    cache = get_default_cache()
+    return dict(cache.stats) if cache is not None else {"hits": 0, "misses": 0, "saved_tokens": 0, "evictions": 0}
+
+
+def stats_since(before: dict) -> dict:
+    """Counters accumulated since `before` (an earlier cache_stats()), e.g. for one run."""
+    return {k: v - before.get(k, 0) for k, v in cache_stats().items()}
@@ -0,0 +1,145 @@
+import functools
+import os
+import threading
+import time
+
+import httpx
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+
+import llm_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+load_dotenv()
+
+# One place that builds the chat model used by every agent. The endpoint is OpenAI when
+# OPENAI_API_KEY is set, else OpenRouter. Clients are memoized per (model, temperature, endpoint)
+# and all of them share one httpx connection pool, so the agents (and repeated runs in the
+# Streamlit app) reuse keep-alive connections to the API instead of each opening their own.
+# Every client answers repeated prompts from llm_cache.
+# Agent factories wrap themselves in @shared_agent so each agent is built once per process.
+
+DEFAULT_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+LLM_POOL_MAXSIZE = int(os.getenv("LLM_POOL_MAXSIZE", "10"))
+
+_http_client = None
+_clients = {}
+_encoding = None
+_encoding_loaded = False
+_lock = threading.Lock()
+# Clients and agents built in this process and the time spent on it (agent time includes the
+# agent's client), see bench_agents.py.
+stats = {"clients": 0, "client_seconds": 0.0, "agents": 0, "agent_seconds": 0.0}
+
+
+def _endpoint() -> tuple:
+    """(api_key, base_url or None, extra_headers or None) for the configured provider."""
+    openai_key = os.getenv("OPENAI_API_KEY")
+    if openai_key:
+        return openai_key, None, None
+    openrouter_key = os.getenv("OPENROUTER_API_KEY")
+    if not openrouter_key:
+        raise ValueError("Missing API key: set OPENAI_API_KEY or OPENROUTER_API_KEY in .env")
+    extra_headers = {
+        "HTTP-Referer": os.getenv("OPENROUTER_SITE_URL", "http://localhost"),
+        "X-Title": os.getenv("OPENROUTER_APP_NAME", "CrewAI App"),
+    }
+    return openrouter_key, OPENROUTER_BASE_URL, extra_headers
+
+
+def _get_http_client() -> httpx.Client:
+    # caller holds _lock
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=10.0),
+            limits=httpx.Limits(max_connections=LLM_POOL_MAXSIZE, max_keepalive_connections=LLM_POOL_MAXSIZE),
+        )
+    return _http_client
+
+
+def _create_llm(model: str, temperature: float, http_client: httpx.Client = None) -> ChatOpenAI:
+    api_key, base_url, extra_headers = _endpoint()
+    kwargs = {"model": model, "temperature": temperature, "api_key": api_key, "http_client": http_client, "cache": llm_cache.get_default_cache()}
+    if base_url:
+        kwargs.update(base_url=base_url, model_kwargs={"extra_headers": extra_headers})
+    return ChatOpenAI(**kwargs)
+
+
+def get_llm(model: str = None, temperature: float = 0.2) -> ChatOpenAI:
+    """Return the shared ChatOpenAI client for (model, temperature) on the configured endpoint."""
+    model = model or DEFAULT_MODEL
+    api_key, base_url, _ = _endpoint()
+    key = (model, temperature, base_url, api_key)
+    with _lock:
+        llm = _clients.get(key)
+        if llm is None:
+            start = time.perf_counter()
+            llm = _create_llm(model, temperature, _get_http_client())
+            _clients[key] = llm
+            stats["clients"] += 1
+            stats["client_seconds"] += time.perf_counter() - start
+        return llm
+
+
+def shared_agent(build):
+    """Decorator for a get_*_agent() factory: build the agent on the first call, then reuse it.
+
+    The undecorated factory stays available as `.__wrapped__` for a fresh instance.
+    """
+    lock = threading.Lock()
+    agent = None
+
+    @functools.wraps(build)
+    def get():
+        nonlocal agent
+        with lock:
+            if agent is None:
+                start = time.perf_counter()
+                agent = build()
+                stats["agents"] += 1
+                stats["agent_seconds"] += time.perf_counter() - start
+            return agent
+
+    return get
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting prompts (about 4 characters per token for English)."""
+    return (len(text or "") + 3) // 4
+
+
+def _get_encoding():
+    # caller holds _lock; tried once per process (tiktoken may need to download the BPE file)
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        if tiktoken is not None:
+            try:
+                try:
+                    _encoding = tiktoken.encoding_for_model(DEFAULT_MODEL)
+                except KeyError:
+                    _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Tokens of `text` under the model's tokenizer (tiktoken), else estimate_tokens()."""
+    with _lock:
+        encoding = _get_encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text or "", disallowed_special=()))
+
+
+def setup_stats() -> dict:
+    """Clients/agents built so far in this process and the time spent building them."""
+    return dict(stats)
@@ -0,0 +1,141 @@
+import os
+import time
+import zlib
+from typing import Optional
+
+import http_client
+import resilience
+import sqlite_store
+from url_utils import normalize_url
+
+# Disk-backed HTTP response cache for article pages. Entries younger than the TTL are served
+# straight from disk; older ones are revalidated with If-None-Match / If-Modified-Since so an
+# unchanged page costs a 304 instead of a full download. The file is trimmed LRU-first once it
+# grows past max_bytes (see sqlite_store).
+
+DEFAULT_PATH = os.getenv("PAGE_CACHE_PATH", os.path.join(".cache", "pages.sqlite3"))
+DEFAULT_TTL = float(os.getenv("PAGE_CACHE_TTL", "3600"))
+DEFAULT_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    body BLOB NOT NULL,
+    content_type TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+"""
+
+
+class PageCache(sqlite_store.SQLiteStore):
+    """SQLite cache of page bodies keyed by normalized URL (bodies are zlib-compressed)."""
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(path, "pages", _SCHEMA, max_bytes, ("hits", "revalidated", "misses"))
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, body, content_type, etag, last_modified, fetched_at FROM pages WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._touch(key)
+        url, body, content_type, etag, last_modified, fetched_at = row
+        return {
+            "url": url,
+            "body": zlib.decompress(body),
+            "content_type": content_type or "",
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": fetched_at,
+        }
+
+    def put(self, key: str, url: str, body: bytes, content_type: str = "", etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        blob = zlib.compress(body, 6)
+        now = time.time()
+        with self._lock:
+            self._store({
+                "key": key, "url": url, "body": blob, "content_type": content_type, "etag": etag,
+                "last_modified": last_modified, "fetched_at": now, "accessed_at": now, "size": len(blob),
+            })
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as freshly validated (after a 304)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+
+    def is_fresh(self, url: str) -> bool:
+        """True if `url` would be served from the cache without touching the network."""
+        with self._lock:
+            row = self._conn.execute("SELECT fetched_at FROM pages WHERE key = ?", (normalize_url(url),)).fetchone()
+        return row is not None and time.time() - row[0] < self.ttl
+
+    def fetch(self, url: str, timeout: float = 8, max_bytes: Optional[int] = None) -> dict:
+        """Return {url, body, content_type, from_cache} for `url`, using the cache where possible.
+
+        Downloads are streamed: the Content-Type is checked before any of the body is read, non-HTML
+        responses are skipped, and reading stops after `max_bytes` (http_client.MAX_BODY_BYTES).
+        Raises resilience.FetchError for error statuses and non-HTML pages, and the underlying
+        requests exception for network failures when nothing usable is cached.
+        """
+        key = normalize_url(url)
+        entry = self.get(key)
+        if entry is not None and time.time() - entry["fetched_at"] < self.ttl:
+            self._count("hits")
+            return {"url": url, "body": entry["body"], "content_type": entry["content_type"], "from_cache": True}
+
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            resp = http_client.get(url, headers=headers, timeout=timeout, stream=True)
+        except Exception:
+            if entry is None:
+                raise
+            # network failure: a stale copy is better than nothing
+            self._count("hits")
+            return {"url": url, "body": entry["body"], "content_type": entry["content_type"], "from_cache": True}
+
+        if resp.status_code == 304 and entry is not None:
+            resp.close()
+            self.touch(key)
+            self._count("revalidated")
+            return {"url": url, "body": entry["body"], "content_type": entry["content_type"], "from_cache": True}
+
+        self._count("misses")
+        content_type = resp.headers.get("Content-Type", "")
+        if not resp.ok:
+            resp.close()
+            raise resilience.FetchError(resilience.status_reason(resp.status_code), f"HTTP {resp.status_code}")
+        if not http_client.is_html(content_type):
+            resp.close()
+            raise resilience.FetchError(resilience.NOT_HTML, content_type)
+        body = http_client.read_capped(resp, max_bytes)
+        self.put(key, url, body, content_type, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        return {"url": url, "body": body, "content_type": content_type, "from_cache": False}
+
+
+_default_cache = sqlite_store.Singleton(PageCache)
+
+
+def get_default_cache() -> PageCache:
+    """Return the process-wide page cache (shared by all Streamlit sessions)."""
+    return _default_cache.get()
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of the default cache since process start."""
+    return dict(get_default_cache().stats)
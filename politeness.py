@@ -0,0 +1,181 @@
+import asyncio
+import os
+import threading
+import time
+from typing import List
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import http_client
+
+# Per-host politeness for page fetches: robots.txt is fetched and parsed once per host (cached
+# for ROBOTS_TTL seconds) and every host gets a token bucket, slowed down to the site's
+# Crawl-delay when it declares one. The fetch engine waits for a host's turn *before* taking a
+# global download slot, so a throttled host never blocks fetches to other hosts.
+
+DEFAULT_RATE = float(os.getenv("POLITENESS_RATE", "2"))    # requests per second per host
+DEFAULT_BURST = float(os.getenv("POLITENESS_BURST", "2"))
+ROBOTS_TTL = float(os.getenv("ROBOTS_TTL", "3600"))
+ROBOTS_ERROR_TTL = 60.0
+ROBOTS_TIMEOUT = 5
+
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+
+class _TokenBucket:
+    """Reservation-style token bucket: reserve() never blocks, it returns how long to wait."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = max(rate, 1e-6)
+        self.capacity = max(burst, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1.0
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class PolitenessScheduler:
+    """robots.txt cache + per-host token buckets shared by all fetchers in the process."""
+
+    def __init__(self, user_agent: str = http_client.USER_AGENT, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST, robots_ttl: float = ROBOTS_TTL):
+        self.user_agent = user_agent
+        self.rate = rate
+        self.burst = burst
+        self.robots_ttl = robots_ttl
+        self.stats = {"robots_fetched": 0, "disallowed": 0, "throttled": 0}
+        self._robots = {}        # origin -> (expires_at, RobotFileParser)
+        self._buckets = {}       # origin -> _TokenBucket
+        self._origin_locks = {}  # origin -> lock, so robots.txt is fetched once per host
+        self._lock = threading.Lock()
+
+    def _origin_lock(self, origin: str) -> threading.Lock:
+        with self._lock:
+            return self._origin_locks.setdefault(origin, threading.Lock())
+
+    def _load_robots(self, origin: str) -> RobotFileParser:
+        parser = RobotFileParser(origin + "/robots.txt")
+        ttl = self.robots_ttl
+        try:
+            resp = http_client.get(origin + "/robots.txt", timeout=ROBOTS_TIMEOUT)
+            if resp.status_code in (401, 403):
+                parser.disallow_all = True
+            elif resp.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(resp.text.splitlines())
+        except Exception:
+            # unreachable robots.txt: allow, but look again soon
+            parser.allow_all = True
+            ttl = ROBOTS_ERROR_TTL
+        with self._lock:
+            self.stats["robots_fetched"] += 1
+            self._robots[origin] = (time.monotonic() + ttl, parser)
+            self._buckets.pop(origin, None)  # recreate with the (possibly new) Crawl-delay
+        return parser
+
+    def _cached_robots(self, origin: str):
+        cached = self._robots.get(origin)
+        return cached[1] if cached is not None and cached[0] > time.monotonic() else None
+
+    def robots(self, url: str) -> RobotFileParser:
+        origin = _origin(url)
+        cached = self._cached_robots(origin)
+        if cached is not None:
+            return cached
+        with self._origin_lock(origin):
+            cached = self._robots.get(origin)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+            return self._load_robots(origin)
+
+    def allowed(self, url: str) -> bool:
+        """robots.txt check for our user agent (fetches robots.txt on first use per host)."""
+        try:
+            ok = self.robots(url).can_fetch(self.user_agent, url)
+        except Exception:
+            ok = True
+        if not ok:
+            with self._lock:
+                self.stats["disallowed"] += 1
+        return ok
+
+    def _bucket(self, url: str) -> _TokenBucket:
+        origin = _origin(url)
+        with self._lock:
+            bucket = self._buckets.get(origin)
+            if bucket is None:
+                rate, burst = self.rate, self.burst
+                cached = self._robots.get(origin)
+                delay = cached[1].crawl_delay(self.user_agent) if cached is not None else None
+                if delay:
+                    rate, burst = min(rate, 1.0 / float(delay)), 1.0
+                bucket = self._buckets[origin] = _TokenBucket(rate, burst)
+            return bucket
+
+    def reserve(self, url: str) -> float:
+        """Take the host's next slot and return how many seconds to wait before using it."""
+        delay = self._bucket(url).reserve()
+        if delay > 0:
+            with self._lock:
+                self.stats["throttled"] += 1
+        return delay
+
+    def wait(self, url: str) -> bool:
+        """Blocking form for thread-based callers: False if robots.txt disallows `url`."""
+        if not self.allowed(url):
+            return False
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    async def wait_async(self, url: str, executor=None) -> bool:
+        """Async form: robots.txt is loaded on `executor`, throttling sleeps without a thread.
+        A host whose robots.txt is already cached is checked inline, without queueing behind
+        other hosts' lookups."""
+        if self._cached_robots(_origin(url)) is not None:
+            ok = self.allowed(url)
+        else:
+            ok = await asyncio.get_running_loop().run_in_executor(executor, self.allowed, url)
+        if not ok:
+            return False
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return True
+
+
+def interleave_by_host(urls: List[str]) -> List[str]:
+    """Round-robin `urls` across hosts so consecutive work items hit different hosts."""
+    queues = {}
+    for u in urls:
+        queues.setdefault(_origin(u), []).append(u)
+    out = []
+    while queues:
+        for origin in list(queues):
+            out.append(queues[origin].pop(0))
+            if not queues[origin]:
+                del queues[origin]
+    return out
+
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+def get_default_scheduler() -> PolitenessScheduler:
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = PolitenessScheduler()
+        return _default_scheduler
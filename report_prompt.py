@@ -0,0 +1,104 @@
+import os
+from typing import List, Tuple
+
+import llm_provider
+
+# Compact per-URL sentiment data for the Reporter prompt. Records become one table row each
+# (label, polarity, subjectivity, duplicate count, URL, excerpt) under a summary line computed
+# from every record, and the whole block is held to TOKEN_BUDGET tokens (llm_provider's
+# tokenizer): excerpts are shortened, then dropped, then whole rows are left out, always giving
+# up the least informative pages first. The most positive and most negative pages keep their
+# excerpts longest, so the prompt size tracks the budget rather than the number of results.
+
+TOKEN_BUDGET = int(os.getenv("REPORT_PROMPT_TOKENS", "3000"))
+EXCERPT_CHARS = int(os.getenv("REPORT_EXCERPT_CHARS", "400"))
+# An excerpt shorter than this many tokens is not worth its row space.
+MIN_EXCERPT_TOKENS = 12
+# Share of the budget kept for excerpts when there are more rows than fit.
+EXCERPT_SHARE = 0.4
+
+HEADER = "label | polarity | subjectivity | copies | url | excerpt"
+
+
+def _clean(text: str) -> str:
+    return " ".join((text or "").split()).replace("|", "/")
+
+
+def _priority(records: List[dict]) -> List[int]:
+    """Indices of scored records, most informative first: the most positive and the most
+    negative page, then the rest by distance from neutral."""
+    scored = [i for i, r in enumerate(records) if r.get("polarity") is not None]
+    positive = sorted((i for i in scored if records[i]["polarity"] >= 0), key=lambda i: -records[i]["polarity"])
+    negative = sorted((i for i in scored if records[i]["polarity"] < 0), key=lambda i: records[i]["polarity"])
+    order = []
+    for pair in zip(positive[:1], negative[:1]):
+        order.extend(pair)
+    rest = [i for i in scored if i not in order]
+    order.extend(sorted(rest, key=lambda i: -abs(records[i]["polarity"])))
+    return order
+
+
+def _summary(records: List[dict]) -> str:
+    counts = {}
+    for r in records:
+        counts[r.get("label", "unknown")] = counts.get(r.get("label", "unknown"), 0) + 1
+    scored = [r["polarity"] for r in records if r.get("polarity") is not None]
+    mean = sum(scored) / len(scored) if scored else 0.0
+    labels = ", ".join(f"{label} {n}" for label, n in sorted(counts.items(), key=lambda kv: -kv[1]))
+    return f"{len(records)} sources ({labels}); mean polarity {mean:.2f}"
+
+
+def _row(record: dict, excerpt: str = "") -> str:
+    return (
+        f"{record.get('label', '')} | {record['polarity']:.2f} | {record.get('subjectivity') or 0:.2f} | "
+        f"{1 + len(record.get('duplicates') or [])} | {record.get('url', '')} | {excerpt}"
+    ).rstrip()
+
+
+def _fit_excerpt(text: str, tokens: int) -> str:
+    """Longest word-boundary prefix of `text` within `tokens` tokens (with a trailing ellipsis)."""
+    if llm_provider.count_tokens(text) <= tokens:
+        return text
+    cut = text[:tokens * 4]
+    while cut and llm_provider.count_tokens(cut + "…") > tokens:
+        cut = cut[:int(len(cut) * 0.8)]
+    cut = cut.rsplit(" ", 1)[0] if " " in cut else cut
+    return cut + "…" if cut else ""
+
+
+def build_sentiment_table(records: List[dict], budget: int = TOKEN_BUDGET) -> Tuple[str, dict]:
+    """Per-URL sentiment data as a compact table of at most `budget` tokens.
+
+    Returns (text, info) where info has "tokens", "rows", "omitted" (scored pages left out)
+    and "excerpts" (rows that kept an excerpt). Pages without scores (failed, skipped) only
+    count towards the summary line.
+    """
+    summary = _summary(records)
+    order = _priority(records)
+    used = llm_provider.count_tokens(summary) + llm_provider.count_tokens(HEADER) + 2
+    rows_budget = budget - int(budget * EXCERPT_SHARE)
+    rows = {}
+    for i in order:
+        cost = llm_provider.count_tokens(_row(records[i])) + 1
+        if used + cost > rows_budget:
+            break
+        rows[i] = ""
+        used += cost
+    for i in order:
+        if i not in rows:
+            break
+        remaining = budget - used
+        if remaining < MIN_EXCERPT_TOKENS:
+            break
+        excerpt = _fit_excerpt(_clean(records[i].get("excerpt", ""))[:EXCERPT_CHARS], remaining)
+        if llm_provider.count_tokens(excerpt) < MIN_EXCERPT_TOKENS:
+            continue
+        rows[i] = excerpt
+        used += llm_provider.count_tokens(_row(records[i], excerpt)) - llm_provider.count_tokens(_row(records[i]))
+    lines = [summary, HEADER] + [_row(records[i], rows[i]) for i in sorted(rows)]
+    omitted = len(order) - len(rows)
+    if omitted:
+        lines.append(f"({omitted} more sources omitted for length)")
+    text = "\n".join(lines)
+    info = {"tokens": llm_provider.count_tokens(text), "rows": len(rows), "omitted": omitted, "excerpts": sum(1 for e in rows.values() if e)}
+    return text, info
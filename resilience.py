@@ -0,0 +1,161 @@
+import email.utils
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import requests
+
+# Retry/backoff policy, per-host circuit breaker and failure classification used by http_client
+# for every outbound request. Idempotent requests that hit a connection error, a timeout or a
+# retryable status are retried with jittered exponential backoff (honouring Retry-After); a host
+# that fails CB_FAILURES times within CB_WINDOW seconds is short-circuited for CB_COOLDOWN
+# seconds so callers fail fast instead of waiting out full timeouts.
+
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "8"))
+# A Retry-After longer than this is not waited out; the response is returned as-is.
+MAX_RETRY_AFTER = float(os.getenv("HTTP_MAX_RETRY_AFTER", "30"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+CB_FAILURES = int(os.getenv("CB_FAILURES", "5"))
+CB_WINDOW = float(os.getenv("CB_WINDOW", "60"))
+CB_COOLDOWN = float(os.getenv("CB_COOLDOWN", "30"))
+
+# Failure reasons reported to the UI alongside the "failed" label.
+TIMEOUT = "timeout"
+BLOCKED = "blocked"
+NOT_HTML = "not HTML"
+HTTP_ERROR = "http error"
+CONNECTION_ERROR = "connection error"
+CIRCUIT_OPEN = "host unavailable"
+NO_CONTENT = "no content"
+SKIPPED = "skipped"  # the analysis ran out of time before this URL was fetched
+FOREIGN_LANGUAGE = "other language"  # not in language.TARGET_LANGUAGES; fetched but not scored
+ERROR = "error"
+
+BLOCKED_STATUSES = {401, 403, 429, 451}
+# Circuit breaker outcome of a final response: 5xx and 429 (the host asks us to back off) count
+# as host failures; the other blocked statuses are often per-page (paywalls, geo-blocks) and
+# count as neither failure nor success, so they do not clear a host's recent failures.
+HOST_FAILURE_STATUSES = {429}
+NEUTRAL_STATUSES = BLOCKED_STATUSES - HOST_FAILURE_STATUSES
+
+
+class FetchError(Exception):
+    """A fetch that failed for a known reason (one of the reason constants above)."""
+
+    def __init__(self, reason: str, message: str = ""):
+        super().__init__(message or reason)
+        self.reason = reason
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for retry number `attempt` (0-based)."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def retry_after(resp: requests.Response) -> Optional[float]:
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP-date), if any."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def status_reason(status_code: int) -> str:
+    return BLOCKED if status_code in BLOCKED_STATUSES else HTTP_ERROR
+
+
+def classify(exc: BaseException) -> str:
+    """Map an exception from a fetch to a failure reason."""
+    if isinstance(exc, FetchError):
+        return exc.reason
+    if isinstance(exc, CircuitOpenError):
+        return CIRCUIT_OPEN
+    if isinstance(exc, requests.Timeout):
+        return TIMEOUT
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return status_reason(exc.response.status_code)
+    if isinstance(exc, requests.ConnectionError):
+        return CONNECTION_ERROR
+    return ERROR
+
+
+class CircuitBreaker:
+    """Per-host breaker: closed -> open after N failures in a window -> half-open probe after cooldown."""
+
+    def __init__(self, failures: int = CB_FAILURES, window: float = CB_WINDOW, cooldown: float = CB_COOLDOWN):
+        self.failures = failures
+        self.window = window
+        self.cooldown = cooldown
+        self._recent = {}       # host -> deque of failure timestamps
+        self._open_until = {}   # host -> monotonic time the cooldown ends
+        self._probing = set()   # hosts with a half-open probe in flight
+        self._lock = threading.Lock()
+
+    def before_request(self, host: str) -> None:
+        with self._lock:
+            until = self._open_until.get(host)
+            if until is None:
+                return
+            if time.monotonic() < until or host in self._probing:
+                raise CircuitOpenError(f"circuit open for {host}")
+            # cooldown over: let exactly one probe through
+            self._probing.add(host)
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            self._recent.pop(host, None)
+            self._open_until.pop(host, None)
+            self._probing.discard(host)
+
+    def record_failure(self, host: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if host in self._probing:
+                self._probing.discard(host)
+                self._open_until[host] = now + self.cooldown
+                return
+            recent = self._recent.setdefault(host, deque())
+            recent.append(now)
+            while recent and recent[0] < now - self.window:
+                recent.popleft()
+            if len(recent) >= self.failures:
+                recent.clear()
+                self._open_until[host] = now + self.cooldown
+
+    def release(self, host: str) -> None:
+        """End a request that neither succeeded nor failed at the host level (e.g. a bad URL).
+
+        Only matters for a half-open probe, which is dropped so the next request probes again.
+        """
+        with self._lock:
+            self._probing.discard(host)
+
+    def is_open(self, host: str) -> bool:
+        with self._lock:
+            until = self._open_until.get(host)
+            return until is not None and time.monotonic() < until
+
+
+_breaker = CircuitBreaker()
+
+
+def get_breaker() -> CircuitBreaker:
+    return _breaker
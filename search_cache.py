@@ -0,0 +1,159 @@
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Search-result cache shared by every Streamlit session in the process. Scraped search engines
+# throttle quickly, so a keyword searched a few minutes ago is answered from memory (or from the
+# optional SQLite backing file) instead of hitting DuckDuckGo/Bing again.
+
+DEFAULT_TTL = float(os.getenv("SEARCH_CACHE_TTL", "900"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "256"))
+# Empty path keeps the cache in-process only.
+DEFAULT_PATH = os.getenv("SEARCH_CACHE_PATH", "")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    engine TEXT NOT NULL,
+    query TEXT NOT NULL,
+    max_results INTEGER NOT NULL,
+    results TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (engine, query)
+);
+"""
+
+
+def normalize_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+
+class SearchCache:
+    """TTL + LRU cache of search results keyed by (engine, normalized query, max_results).
+
+    One entry is kept per (engine, query) together with the max_results it was fetched with, so
+    a request for fewer results is served by slicing a larger entry. An entry that returned fewer
+    results than it asked for is exhaustive and serves any max_results.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES, path: Optional[str] = DEFAULT_PATH):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.executescript(_SCHEMA)
+
+    def _load(self, key: tuple) -> Optional[tuple]:
+        # caller holds self._lock
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            "SELECT max_results, results, stored_at FROM searches WHERE engine = ? AND query = ?", key
+        ).fetchone()
+        if row is None:
+            return None
+        max_results, results, stored_at = row
+        return stored_at, max_results, json.loads(results)
+
+    def get(self, engine: str, query: str, max_results: int) -> Optional[list]:
+        key = (engine, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key) or self._load(key)
+            if entry is not None and time.time() - entry[0] >= self.ttl:
+                self._entries.pop(key, None)
+                entry = None
+            if entry is not None:
+                stored_at, cached_max, results = entry
+                if cached_max >= max_results or len(results) < cached_max:
+                    self._entries[key] = entry
+                    self._entries.move_to_end(key)
+                    self._trim()
+                    self.stats["hits"] += 1
+                    return list(results[:max_results])
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, engine: str, query: str, max_results: int, results: list) -> None:
+        if not results:
+            # an empty page is usually a block or a hiccup; don't pin it for the whole TTL
+            return
+        key = (engine, normalize_query(query))
+        entry = (time.time(), max_results, list(results))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._trim()
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO searches (engine, query, max_results, results, stored_at) VALUES (?, ?, ?, ?, ?)",
+                    (key[0], key[1], max_results, json.dumps(entry[2]), entry[0]),
+                )
+                self._conn.execute("DELETE FROM searches WHERE stored_at < ?", (time.time() - self.ttl,))
+
+    def _trim(self) -> None:
+        # caller holds self._lock
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM searches")
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> SearchCache:
+    """Return the process-wide search cache (shared by all Streamlit sessions)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SearchCache()
+        return _default_cache
+
+
+def cache_stats() -> dict:
+    return dict(get_default_cache().stats)
+
+
+def cached_call(engine: str, func, query: str, max_results: int = 10, *args, cancel: Optional[threading.Event] = None, **kwargs) -> list:
+    """`func(query, max_results, *args, **kwargs)` answered from the cache under `engine`.
+
+    Exceptions from `func` propagate and nothing is stored. With `cancel`, `func` gets it as a
+    keyword argument and the result is not stored if it was set by the time `func` returned
+    (a cut-off call's result may be partial).
+    """
+    cache = get_default_cache()
+    results = cache.get(engine, query, max_results)
+    if results is not None:
+        return results
+    if cancel is not None:
+        kwargs["cancel"] = cancel
+    results = func(query, max_results, *args, **kwargs)
+    if cancel is None or not cancel.is_set():
+        cache.put(engine, query, max_results, results)
+    return results
+
+
+def cached_search(engine: str):
+    """Decorator for `search(query, max_results=10, timeout=10) -> list` functions."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(query: str, max_results: int = 10, *args, **kwargs) -> list:
+            return cached_call(engine, func, query, max_results, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,327 @@
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from textblob._text import EMOTICONS, RE_EMOTICONS as _EMOTICONS_RE
+
+# Batch re-implementation of TextBlob's default (pattern) sentiment analyzer.
+#
+# TextBlob re-tokenizes a document for every .sentiment access and walks its lexicon (a dict of
+# dicts behind a lazy-loading wrapper) token by token. Here the lexicon is loaded once into flat
+# NumPy arrays indexed by token id, every document of a batch is tokenized with one regex, and
+# token ids, lengths and the "gap" effects of unknown words are computed with array operations.
+# Only the tokens that can change the analyzer's state (lexicon words, negations, "!", "(!)" and
+# emoticons; typically ~10% of a text) go through the sequential modifier/negation rules, and the
+# per-document averages are taken with np.bincount.
+#
+# The tokenizer is a regex approximation of pattern's find_tokens: abbreviations such as "Dr."
+# lose their period like any other word, so scores can differ slightly from TextBlob's. On the
+# pages in fixtures/ and the synthetic corpus of bench_sentiment.py both scores agree within
+# TOLERANCE (exactly, at the time of writing).
+
+TOLERANCE = 0.02
+# Bump when scores change for the same text (invalidates the analysis cache).
+VERSION = "1"
+
+# Documents are scored section by section (score_documents): each text is cut after sentence
+# ends into sections of about SECTION_CHARS characters, and sections are tokenized CHUNK_CHARS
+# characters at a time, so memory stays flat however long a page is. Modifier/negation state
+# does not carry over a section boundary, the only difference from scoring a text in one piece.
+SECTION_CHARS = int(os.getenv("SENTIMENT_SECTION_CHARS", "2000"))
+_SENTENCE_END_RE = re.compile(r"[.!?]+[\"'”’)\]]*\s+|\n\s*\n")
+
+# Optional process pool for large batches (scoring is pure-Python CPU work under the GIL).
+# SENTIMENT_WORKERS=0 keeps scoring in-process; batches smaller than PARALLEL_MIN_CHARS are
+# always scored in-process because starting work on the pool costs more than it saves. Sections
+# are sent in chunks of roughly CHUNK_CHARS characters so pickling overhead stays small.
+WORKERS = int(os.getenv("SENTIMENT_WORKERS", "0"))
+PARALLEL_MIN_CHARS = int(os.getenv("SENTIMENT_PARALLEL_MIN_CHARS", "500000"))
+CHUNK_CHARS = int(os.getenv("SENTIMENT_CHUNK_CHARS", "200000"))
+
+_PUNCTUATION = ".,;:!?()[]{}`'\"@#$^&*+-|=~_"
+_QUOTES = "'\"“”‘’"
+_EDGE = re.escape(_PUNCTUATION + _QUOTES[2:])
+_SPLIT = re.escape(_QUOTES)
+_SARCASM_RE = re.compile(r"\( ?! ?\)")
+
+# flags per token id
+_KNOWN = 1
+_MODIFIER = 2   # adverb that scales the next lexicon word ("very good")
+_LY = 4         # modifier that also scopes a following negation ("really not good")
+_NEGATION = 8
+_EXCLAIM = 16
+_IRONY = 32
+_EMOTICON = 64
+
+
+class _Lexicon:
+    """Token -> id map plus polarity/subjectivity/intensity/flag/length arrays indexed by id."""
+
+    def __init__(self):
+        from textblob.en import sentiment as pattern
+
+        if not dict.__len__(pattern):
+            pattern.load()
+        entries = {}
+        for word in dict.keys(pattern):
+            senses = dict.__getitem__(pattern, word)
+            p, s, i = senses[None]
+            flags = _KNOWN
+            if any(pos in senses for pos in pattern.modifiers):
+                flags |= _MODIFIER
+            if pattern.modifier(word):
+                flags |= _LY
+            if word in pattern.negations:
+                flags |= _NEGATION
+            entries[word] = (p, s, i, flags)
+        for word in pattern.negations:
+            entries.setdefault(word, (0.0, 0.0, 1.0, _NEGATION))
+        entries.setdefault("!", (0.0, 0.0, 1.0, _EXCLAIM))
+        entries.setdefault("(!)", (0.0, 1.0, 1.0, _IRONY))
+        for (_, polarity), faces in EMOTICONS.items():
+            for face in faces:
+                face = face.lower()
+                if not face.isalpha() and len(face) <= 5 and face not in _PUNCTUATION and face not in entries:
+                    entries[face] = (polarity, 1.0, 1.0, _EMOTICON)
+
+        self.vocab = {word: n for n, word in enumerate(entries)}
+        values = list(entries.values())
+        self.polarity = np.array([v[0] for v in values], dtype=np.float64)
+        self.subjectivity = np.array([v[1] for v in values], dtype=np.float64)
+        self.intensity = np.array([v[2] for v in values], dtype=np.float64)
+        self.flags = np.array([v[3] for v in values], dtype=np.int32)
+        self.length = np.array([len(w) for w in entries], dtype=np.int32)
+
+        self.token_re = re.compile(
+            r"\.{3,}"                             # ellipsis
+            rf"|[{_EDGE}{_SPLIT}]"                # punctuation split off the edges of words, quotes anywhere
+            rf"|[^\s{_EDGE}{_SPLIT}](?:[^\s{_SPLIT}]*[^\s{_EDGE}{_SPLIT}])?"
+        )
+
+    def tokenize(self, text: str) -> List[str]:
+        # same post-processing as find_tokens: re-join split emoticons (": )" -> ":)") and "( ! )"
+        joined = " ".join(self.token_re.findall(text.replace("n't", " n't")))
+        joined = _SARCASM_RE.sub("(!)", joined)
+        joined = _EMOTICONS_RE.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), joined)
+        return joined.lower().split()
+
+
+_lexicon = None
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon() -> _Lexicon:
+    """Load the sentiment lexicon once per process."""
+    global _lexicon
+    with _lexicon_lock:
+        if _lexicon is None:
+            _lexicon = _Lexicon()
+        return _lexicon
+
+
+def _clamp(x: float) -> float:
+    return -1.0 if x < -1.0 else 1.0 if x > 1.0 else x
+
+
+def assess_batch(texts: Sequence[str]) -> List[Tuple[float, float, int]]:
+    """Return (polarity sum, subjectivity sum, number of assessed words) for each text.
+
+    TextBlob's scores are these sums divided by the count; keeping them apart lets scores of
+    separately assessed pieces of a document be combined exactly.
+    """
+    if not texts:
+        return []
+    lex = get_lexicon()
+    tokens_per_doc = [lex.tokenize(text or "") for text in texts]
+    sizes = np.fromiter(map(len, tokens_per_doc), dtype=np.int64, count=len(texts))
+    tokens = [tok for doc in tokens_per_doc for tok in doc]
+    if not tokens:
+        return [(0.0, 0.0, 0)] * len(texts)
+
+    ids = np.fromiter(map(lex.vocab.get, tokens, repeat(-1)), dtype=np.int64, count=len(tokens))
+    doc_of = np.repeat(np.arange(len(texts)), sizes)
+    unknown = ids < 0
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    # An unknown word longer than 1 char ends a pending negation ("not a good" keeps it), one
+    # longer than 2 chars ends a pending modifier ("really is a good" keeps it). Prefix sums give,
+    # for every stateful token, whether such a word occurred since the previous stateful token.
+    clears_neg = np.concatenate(([0], np.cumsum(unknown & (lengths > 1))))
+    clears_mod = np.concatenate(([0], np.cumsum(unknown & (lengths > 2))))
+    events = np.flatnonzero(~unknown)
+    starts = np.concatenate(([0], events[:-1] + 1))
+    gap_neg = (clears_neg[events] - clears_neg[starts] > 0).tolist()
+    gap_mod = (clears_mod[events] - clears_mod[starts] > 0).tolist()
+    event_ids = ids[events]
+    event_docs = doc_of[events].tolist()
+    flags = lex.flags[event_ids].tolist()
+    pol = lex.polarity[event_ids].tolist()
+    subj = lex.subjectivity[event_ids].tolist()
+    inten = lex.intensity[event_ids].tolist()
+    length = lex.length[event_ids].tolist()
+
+    # Sequential part: pattern's Sentiment.assessments() rules over the stateful tokens only.
+    out_p, out_s, out_neg, out_doc = [], [], [], []
+    doc = -1
+    mod = neg = False
+    mod_ly = False
+    last = -1  # index of the current document's last assessment
+    for k, f in enumerate(flags):
+        if event_docs[k] != doc:
+            doc = event_docs[k]
+            mod = neg = False
+            last = -1
+        else:
+            if neg and gap_neg[k]:
+                neg = False
+            if mod and gap_mod[k]:
+                mod = False
+        if f & _KNOWN:
+            if not mod:
+                out_p.append(pol[k]); out_s.append(subj[k]); out_neg.append(1); out_doc.append(doc)
+                last = len(out_p) - 1
+                intensity = inten[k]
+            else:
+                out_p[last] = _clamp(pol[k] * intensity)
+                out_s[last] = _clamp(subj[k] * intensity)
+                intensity = inten[k]
+            if neg:
+                intensity = 1.0 / intensity
+                out_neg[last] = -1
+            neg = bool(f & _NEGATION)
+            mod = bool(f & _MODIFIER)
+            mod_ly = bool(f & _LY)
+            continue
+        if f & _NEGATION:
+            neg = True
+        elif neg and length[k] > 1:
+            neg = False
+        if neg and mod and mod_ly:
+            out_neg[last] = -1
+            neg = False
+        elif mod and length[k] > 2:
+            mod = False
+        if f & _EXCLAIM and last >= 0:
+            out_p[last] = _clamp(out_p[last] * 1.25)
+        if f & (_IRONY | _EMOTICON):
+            out_p.append(pol[k]); out_s.append(subj[k]); out_neg.append(1); out_doc.append(doc)
+            last = len(out_p) - 1
+            intensity = 1.0
+
+    if not out_p:
+        return [(0.0, 0.0, 0)] * len(texts)
+    p = np.asarray(out_p)
+    p = np.where(np.asarray(out_neg) < 0, p * -0.5, p)
+    docs = np.asarray(out_doc)
+    counts = np.bincount(docs, minlength=len(texts))
+    polarity = np.bincount(docs, weights=p, minlength=len(texts))
+    subjectivity = np.bincount(docs, weights=np.asarray(out_s), minlength=len(texts))
+    return list(zip(polarity.tolist(), subjectivity.tolist(), counts.tolist()))
+
+
+def score_batch(texts: Sequence[str]) -> List[Tuple[float, float]]:
+    """Return (polarity, subjectivity) for each text, like TextBlob(text).sentiment."""
+    return [(p / (n or 1), s / (n or 1)) for p, s, n in assess_batch(texts)]
+
+
+def score(text: str) -> Tuple[float, float]:
+    return score_batch([text])[0]
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool shared by all callers; each worker loads the lexicon once at start-up."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn: forking a process that runs threads (Streamlit, the fetch pool) is unsafe
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=get_lexicon)
+            _pool_workers = workers
+        return _pool
+
+
+def iter_sections(text: str, section_chars: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) offsets of consecutive sections of `text`, cut after a sentence end."""
+    section_chars = section_chars or SECTION_CHARS
+    start, size = 0, len(text)
+    while start < size:
+        target = start + section_chars
+        if target >= size:
+            yield start, size
+            return
+        m = _SENTENCE_END_RE.search(text, target, target + section_chars)
+        if m is not None:
+            end = m.end()
+        else:
+            space = text.find(" ", target)
+            end = size if space < 0 else space + 1
+        yield start, end
+        start = end
+
+
+def _section_chunks(texts: Sequence[str], section_chars: int, chunk_chars: int) -> Iterator[list]:
+    """Group the sections of all texts into lists of (doc, start, end) of ~chunk_chars characters."""
+    chunk, size = [], 0
+    for doc, text in enumerate(texts):
+        for start, end in iter_sections(text or "", section_chars):
+            chunk.append((doc, start, end))
+            size += end - start
+            if size >= chunk_chars:
+                yield chunk
+                chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+
+def score_documents(texts: Sequence[str], section_chars: Optional[int] = None, workers: Optional[int] = None, chunk_chars: Optional[int] = None) -> List[dict]:
+    """Score each text section by section; returns {polarity, subjectivity, sections} per text.
+
+    Sections are {start, end, polarity, subjectivity, assessed}: character ranges of the text,
+    their own scores and how many words were assessed in them. Document scores are running totals
+    of the section sums, so they weigh sections by their assessed words like TextBlob does.
+    Only about `chunk_chars` characters are tokenized at a time, unless the batch is spread over
+    `workers` processes (default SENTIMENT_WORKERS; used for batches over PARALLEL_MIN_CHARS).
+    """
+    section_chars = section_chars or SECTION_CHARS
+    chunk_chars = chunk_chars or CHUNK_CHARS
+    workers = WORKERS if workers is None else workers
+
+    def pieces(chunk: list) -> List[str]:
+        return [texts[doc][start:end] for doc, start, end in chunk]
+
+    chunks = _section_chunks(texts, section_chars, chunk_chars)
+    if workers > 1 and sum(len(t or "") for t in texts) >= PARALLEL_MIN_CHARS:
+        chunks = list(chunks)
+        results = zip(chunks, _get_pool(workers).map(assess_batch, map(pieces, chunks)))
+    else:
+        results = ((chunk, assess_batch(pieces(chunk))) for chunk in chunks)
+
+    totals = [[0.0, 0.0, 0] for _ in texts]
+    sections = [[] for _ in texts]
+    for chunk, scores in results:
+        for (doc, start, end), (p, s, n) in zip(chunk, scores):
+            total = totals[doc]
+            total[0] += p
+            total[1] += s
+            total[2] += n
+            sections[doc].append({
+                "start": start,
+                "end": end,
+                "polarity": p / (n or 1),
+                "subjectivity": s / (n or 1),
+                "assessed": n,
+            })
+    return [
+        {"polarity": p / (n or 1), "subjectivity": s / (n or 1), "sections": secs}
+        for (p, s, n), secs in zip(totals, sections)
+    ]
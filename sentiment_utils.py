@@ -1,46 +1,192 @@
-from textblob import TextBlob
-from bs4 import BeautifulSoup
-import requests
+from typing import Iterable, Iterator, Optional, Tuple
 
+import analysis_cache
+import dedupe
+import extractor
+import html_parser
+import http_client
+import language
+import page_cache
+import politeness
+import resilience
+import sentiment_engine
+from fetch_engine import iter_fetch, Deadline, DEFAULT_CONCURRENCY, DEFAULT_PER_HOST
 
-def _fetch_text_from_url(url: str, timeout: int = 8) -> str:
+# Version of everything that turns a page body into a sentiment record; entries in the analysis
+# cache written by another version are ignored. Bump RECORD_VERSION when _score_texts changes.
+RECORD_VERSION = "1"
+ANALYSIS_VERSION = f"extractor-{extractor.VERSION}/language-{language.VERSION}/engine-{sentiment_engine.VERSION}/record-{RECORD_VERSION}"
+_PAGE_FIELDS = ("text", "title", "author", "published", "canonical", "language")
+
+
+def _fetch_page(url: str, timeout: int = 8) -> dict:
+    """Fetch `url` and extract its main content: {text, title, author, published, canonical, language}.
+
+    The result also carries "content_key" (hash of the body) and, when this exact body was
+    analysed before, the cached sentiment record under "scores" (see analysis_cache).
+    On failure returns {"error": reason} with one of the resilience reason strings.
+    """
     try:
-        resp = requests.get(url, timeout=timeout, headers={"User-Agent": "CrewAI-Bot/1.0"})
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        article = soup.find("article") or soup.find("main") or soup
-        texts = " ".join(t.get_text(" ", strip=True) for t in article.find_all(["p", "h1", "h2", "h3"]))
-        return texts.strip()
-    except Exception:
-        return ""
+        page = page_cache.get_default_cache().fetch(url, timeout=timeout)
+        key = analysis_cache.content_key(page["body"], page["content_type"])
+        cache = analysis_cache.get_default_cache()
+        cached = cache.get(key, ANALYSIS_VERSION)
+        if cached is not None:
+            return {**cached["page"], "content_key": key, "scores": cached.get("scores")}
+        html = http_client.decode_body(page["body"], page["content_type"])
+        extracted = extractor.extract(html)
+        if not extracted["text"]:
+            # nothing scored as main content; fall back to every p/h1/h2/h3 in <article>/<main>/page
+            extracted["text"] = html_parser.parse(html).main_text()
+        if not extracted["text"]:
+            return {"error": resilience.NO_CONTENT}
+        extracted["language"] = language.detect(extracted["text"])[0]
+        cache.put(key, ANALYSIS_VERSION, {"page": extracted})
+        return {**extracted, "content_key": key}
+    except Exception as e:
+        return {"error": resilience.classify(e)}
+
+
+def _fetch_text_from_url(url: str, timeout: int = 8) -> str:
+    return _fetch_page(url, timeout).get("text", "")
+
+
+def _label(polarity: float) -> str:
+    if polarity > 0.15:
+        return "positive"
+    if polarity < -0.15:
+        return "negative"
+    return "neutral"
 
 
-def analyze_sentiment_for_urls(urls: list) -> list:
-    """Fetch each URL, extract text, and compute sentiment using TextBlob.
+def _score_texts(urls: list, pages: list) -> list:
+    """Sentiment records for a batch of URLs and their fetched pages (scored in one pass).
 
-    Returns list of dicts: {url, excerpt, polarity, subjectivity, label}
+    Pages that came with cached "scores" are not scored again; new scores are written back to
+    the analysis cache under the page's content_key. Pages with an "error" are never scored.
     """
-    results = []
-    for url in urls:
-        text = _fetch_text_from_url(url)
-        excerpt = text[:800] if text else ""
-        if not text:
-            results.append({"url": url, "excerpt": excerpt, "polarity": None, "subjectivity": None, "label": "failed"})
+    scored = [i for i, page in enumerate(pages) if page.get("text") and not page.get("scores") and not page.get("error")]
+    docs = dict(zip(scored, sentiment_engine.score_documents([pages[i]["text"] for i in scored])))
+    cache = analysis_cache.get_default_cache()
+    records = []
+    for i, (url, page) in enumerate(zip(urls, pages)):
+        text = page.get("text", "")
+        if page.get("scores") and not page.get("error"):
+            records.append({"url": url, **page["scores"]})
             continue
-        tb = TextBlob(text)
-        polarity = round(tb.sentiment.polarity, 3)
-        subjectivity = round(tb.sentiment.subjectivity, 3)
-        if polarity > 0.15:
-            label = "positive"
-        elif polarity < -0.15:
-            label = "negative"
-        else:
-            label = "neutral"
-        results.append({
-            "url": url,
-            "excerpt": excerpt,
+        if i not in docs:
+            error = page.get("error", "")
+            label = {resilience.SKIPPED: "skipped", resilience.FOREIGN_LANGUAGE: "filtered"}.get(error, "failed")
+            records.append({"url": url, "excerpt": text[:800], "polarity": None, "subjectivity": None, "label": label, "error": error or resilience.NO_CONTENT, "sections": []})
+            continue
+        doc = docs[i]
+        polarity = round(doc["polarity"], 3)
+        scores = {
+            "excerpt": text[:800],
             "polarity": polarity,
-            "subjectivity": subjectivity,
-            "label": label,
-        })
-    return results
+            "subjectivity": round(doc["subjectivity"], 3),
+            "label": _label(polarity),
+            "sections": [
+                {
+                    "start": sec["start"],
+                    "polarity": round(sec["polarity"], 3),
+                    "subjectivity": round(sec["subjectivity"], 3),
+                    "label": _label(sec["polarity"]) if sec["assessed"] else "neutral",
+                    "preview": text[sec["start"]:sec["start"] + 120],
+                }
+                for sec in doc["sections"]
+            ],
+        }
+        if page.get("content_key"):
+            cache.put(page["content_key"], ANALYSIS_VERSION, {"page": {f: page.get(f, "") for f in _PAGE_FIELDS}, "scores": scores})
+        records.append({"url": url, **scores})
+    return records
+
+
+def iter_sentiment_for_urls(urls: list, concurrency: int = DEFAULT_CONCURRENCY, per_host: int = DEFAULT_PER_HOST, deadline: Optional[float] = None, languages: Optional[Iterable[str]] = None) -> Iterator[Tuple[int, int, int, Optional[dict]]]:
+    """Generator form of analyze_sentiment_for_urls: yields (completed, total, group, record)
+    per page.
+
+    Pages are yielded as their downloads finish (in completion order); pages that finish
+    together are scored as one batch. Duplicate pages share a `group` id, and `record` is the
+    group's new record whenever it changed, else None: a later duplicate adds its URL to
+    "duplicates", and a duplicate that comes earlier in `urls` than the group's representative
+    replaces it (the group is represented by its earliest URL; the previous one moves to
+    "duplicates"). Each yielded record is a new dict that is never modified afterwards, so
+    callers keep the latest record per group.
+    `completed` and `total` count URLs after URL-level duplicates are removed.
+    `languages` overrides language.TARGET_LANGUAGES (an empty list disables the filter).
+    """
+    budget = Deadline(deadline)
+    urls, aliases = dedupe.dedupe_urls(urls)
+    index = dedupe.DuplicateIndex()
+    members = {}  # group id -> page ids in the group
+    chosen = {}   # group id -> page id of the record's page
+    records = {}  # group id -> record
+    completed = 0
+    for batch in iter_fetch(
+        urls,
+        lambda u: _fetch_page(u, timeout=max(1.0, budget.remaining(cap=8))),
+        concurrency=concurrency,
+        per_host=per_host,
+        scheduler=politeness.get_default_scheduler(),
+        is_local=page_cache.get_default_cache().is_fresh,
+        on_failure=lambda url, reason: {"error": reason},
+        deadline=deadline,
+    ):
+        pages, group_of = {}, {}
+        for i, page in batch:
+            page = page or {}
+            group = index.add(i, urls[i], page)
+            if page.get("text") and not language.is_target(page.get("language", ""), languages):
+                page = {**page, "error": resilience.FOREIGN_LANGUAGE}
+            group = i if group is None else group
+            members.setdefault(group, []).append(i)
+            pages[i], group_of[i] = page, group
+        touched = sorted(set(group_of.values()))
+        rescore = [(group, min(members[group])) for group in touched if chosen.get(group) != min(members[group])]
+        for (group, i), record in zip(rescore, _score_texts([urls[i] for _, i in rescore], [pages[i] for _, i in rescore])):
+            record.update({
+                "title": pages[i].get("title", ""),
+                "author": pages[i].get("author", ""),
+                "published": pages[i].get("published", ""),
+                "language": pages[i].get("language", ""),
+            })
+            chosen[group] = i
+            records[group] = record
+        for group in touched:
+            rep = chosen[group]
+            others = [u for m in sorted(members[group]) if m != rep for u in (urls[m], *aliases.get(urls[m], []))]
+            records[group] = {**records[group], "duplicates": [*aliases.get(urls[rep], []), *others]}
+        updated = set(touched)
+        for i in sorted(pages):
+            completed += 1
+            group = group_of[i]
+            yield completed, len(urls), group, records[group] if group in updated else None
+            updated.discard(group)
+
+
+def analyze_sentiment_for_urls(urls: list, concurrency: int = DEFAULT_CONCURRENCY, per_host: int = DEFAULT_PER_HOST, deadline: Optional[float] = None, languages: Optional[Iterable[str]] = None) -> list:
+    """Fetch each URL, extract text, and compute sentiment (TextBlob's scores, see sentiment_engine).
+
+    Pages are downloaded concurrently (at most `concurrency` at once, `per_host` per host),
+    honouring robots.txt and per-host rate limits; results keep the order of `urls`.
+    Duplicates are collapsed (see dedupe.py): URL variants before fetching, syndicated or
+    mirrored copies after extraction. Only the group's earliest URL in `urls` is returned and
+    scored, with the others listed under "duplicates".
+
+    Returns list of dicts: {url, excerpt, polarity, subjectivity, label, sections, title, author,
+    published, language, duplicates}. `sections` scores the text in consecutive pieces of a few sentences
+    ({start, polarity, subjectivity, label, preview}), showing where an article changes tone.
+    Failed URLs have label "failed" and an "error" reason (timeout, blocked, not HTML, ...).
+    With a `deadline` (seconds), URLs not fetched in time are labelled "skipped" and each
+    request's timeout is capped by the time left.
+    Pages detected as a language outside `languages` (default language.TARGET_LANGUAGES) are
+    not scored: label "filtered", error "other language".
+    """
+    order = {url: n for n, url in enumerate(urls)}
+    latest = {}
+    for _, _, group, record in iter_sentiment_for_urls(urls, concurrency, per_host, deadline, languages):
+        if record is not None:
+            latest[group] = record
+    return sorted(latest.values(), key=lambda r: order.get(r["url"], len(order)))
@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+# Size-bounded SQLite store shared by the page, analysis and LLM caches. Each cache keeps one
+# table with `key`, `accessed_at` and `size` columns; the store owns the connection (WAL, one
+# lock for all threads), the hit/miss/eviction counters, and LRU trimming once the table grows
+# past max_bytes. The total size is summed once when the file is opened and then kept up to date
+# on every write, so a put does not scan the whole table. It only tracks this process's writes:
+# when several processes share one file, each trims against its own view of the total.
+
+T = TypeVar("T")
+
+_EVICT_BATCH = 64
+
+
+class SQLiteStore:
+    """One SQLite table of cache entries, trimmed least-recently-used first past max_bytes."""
+
+    def __init__(self, path: str, table: str, schema: str, max_bytes: int, counters: tuple = ("hits", "misses")):
+        self.path = path
+        self.table = table
+        self.max_bytes = max_bytes
+        self.stats = {name: 0 for name in counters}
+        self.stats["evictions"] = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(schema)
+        self._total = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _touch(self, key: str, now: Optional[float] = None) -> None:
+        # caller holds self._lock
+        self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now or time.time(), key))
+
+    def _store(self, row: dict) -> None:
+        """Insert or replace `row` (which must include key, accessed_at and size), then trim."""
+        # caller holds self._lock
+        old = self._conn.execute(f"SELECT size FROM {self.table} WHERE key = ?", (row["key"],)).fetchone()
+        columns = ", ".join(row)
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} ({columns}) VALUES ({', '.join('?' * len(row))})",
+            tuple(row.values()),
+        )
+        self._total += row["size"] - (old[0] if old else 0)
+        self._evict()
+
+    def _delete_where(self, condition: str, params: tuple = ()) -> int:
+        """Delete the entries matching `condition` (counted as evictions); returns how many."""
+        # caller holds self._lock
+        size, count = self._conn.execute(
+            f"SELECT COALESCE(SUM(size), 0), COUNT(*) FROM {self.table} WHERE {condition}", params
+        ).fetchone()
+        if count:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE {condition}", params)
+            self._total -= size
+            self.stats["evictions"] += count
+        return count
+
+    def _evict(self) -> None:
+        # caller holds self._lock
+        while self._total > self.max_bytes:
+            rows = self._conn.execute(
+                f"SELECT key, size FROM {self.table} ORDER BY accessed_at LIMIT ?", (_EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                self._total = 0
+                return
+            for key, size in rows:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self.stats["evictions"] += 1
+                self._total -= size
+                if self._total <= self.max_bytes:
+                    return
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._total = 0
+
+
+class Singleton(Generic[T]):
+    """Lazily built process-wide instance (e.g. a cache shared by all Streamlit sessions)."""
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        with self._lock:
+            if self._instance is None:
+                self._instance = self._factory()
+            return self._instance
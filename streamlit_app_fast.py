@@ -1,5 +1,5 @@
 from crewai import Crew, Task
-from crawleragent import get_crawler_agent, search_duckduckgo, search_bing
+from crawleragent import get_crawler_agent, search_web
 from cleaneragent import get_cleaner_agent
 from analyzer_agent import get_analyzer_agent
 from sentiment_agent import get_sentiment_agent
@@ -10,8 +10,16 @@ from wordcloud import WordCloud
 import matplotlib.pyplot as plt
 import io
 import streamlit as st
-import json
-from sentiment_utils import analyze_sentiment_for_urls
+from sentiment_utils import iter_sentiment_for_urls
+from fetch_engine import Deadline
+import language
+from page_cache import cache_stats
+from search_cache import cache_stats as search_cache_stats
+from analysis_cache import cache_stats as analysis_cache_stats
+import llm_cache
+import task_graph
+from comment_batch import generate_comments
+from report_prompt import build_sentiment_table
 import os
 import warnings
 import re
@@ -59,6 +67,28 @@ with st.sidebar:
     st.markdown("---")
     st.info("**LLM:** OpenRouter GPT-4o-mini")
 
+    # Cache counters (process-wide, so they include other sessions' runs); redrawn after the
+    # fetch stage and after the LLM stage of a run, see render_cache_stats
+    cache_stats_box = st.empty()
+
+
+def render_cache_stats():
+    try:
+        pc_stats = cache_stats()
+        ac_stats = analysis_cache_stats()
+        sc_stats = search_cache_stats()
+        lc_stats = llm_cache.cache_stats()
+        with cache_stats_box.container():
+            st.caption(f"📦 Page cache: {pc_stats['hits']} hits · {pc_stats['revalidated']} revalidated · {pc_stats['misses']} misses")
+            st.caption(f"🧠 Analysis cache: {ac_stats['hits']} hits · {ac_stats['misses']} misses")
+            st.caption(f"🔎 Search cache: {sc_stats['hits']} hits · {sc_stats['misses']} misses")
+            st.caption(f"🤖 LLM cache: {lc_stats['hits']} hits · {lc_stats['misses']} misses · {lc_stats['saved_tokens']} tokens saved")
+    except Exception:
+        pass
+
+
+render_cache_stats()
+
 if 'analysis_complete' not in st.session_state:
     st.session_state.analysis_complete = False
 if 'result_text' not in st.session_state:
@@ -85,6 +115,8 @@ keyword = st.text_input(
     label_visibility="collapsed"
 )
 num_results = st.number_input("Number of blogs to find:", min_value=1, max_value=50, value=5, step=1, help="How many search results to collect and analyze")
+time_budget = st.number_input("Time budget for search & fetching (seconds):", min_value=10, max_value=600, value=90, step=10, help="Pages not fetched within this budget are reported as skipped; partial results are still analyzed")
+target_languages = st.text_input("Languages to analyze:", value=", ".join(language.TARGET_LANGUAGES), help="Comma-separated language codes (en, de, fr, ...). Pages in other languages are listed but not scored or sent to the agents; leave empty to analyze every language")
 
 analyze_button = st.button(" Start Analysis & Generate Comment", type="primary", use_container_width=True)
 
@@ -114,11 +146,36 @@ if urls_preview_inline:
     for u in urls_preview_inline:
         st.markdown(f"- [{u}]({u})")
 
+def render_sentiment_row(item):
+    """One line per analysed URL: label, scores, duplicates, where it turns negative, excerpt."""
+    url = item.get('url')
+    label = item.get('label', 'unknown')
+    pol = item.get('polarity')
+    subj = item.get('subjectivity')
+    excerpt = item.get('excerpt', '')
+    if item.get('error'):
+        st.markdown(f"- **{label.upper()}** — ({item['error']}) — [{url}]({url})")
+    else:
+        st.markdown(f"- **{label.upper()}** — ({pol}, subj={subj}) — [{url}]({url})")
+    if item.get('language'):
+        st.caption(f"Language: {item['language']}")
+    if item.get('duplicates'):
+        st.caption(f"Also published at: {', '.join(item['duplicates'])}")
+    sections = item.get('sections', [])
+    if len(sections) > 1 and label != 'negative':
+        turn = next((sec for sec in sections if sec['label'] == 'negative'), None)
+        if turn:
+            st.caption(f"Turns negative ({turn['polarity']}) around: \"{turn['preview']}…\"")
+    if excerpt:
+        st.text(excerpt[:400] + ("..." if len(excerpt) > 400 else ""))
+
+
 if analyze_button and keyword:
     st.session_state.keyword = keyword
     st.session_state.analysis_complete = False
     st.markdown("---")
     st.markdown(f"### 📊 Analyzing: **{keyword}**")
+    llm_stats_before = llm_cache.cache_stats()
     
     progress_bar = st.progress(0)
     status_text = st.empty()
@@ -128,65 +185,93 @@ if analyze_button and keyword:
         agent_containers[i] = st.empty()
     
     try:
-        status_text.info("⭐Initializing AI agents...")
+
+        # Run a web search to get real URLs for the keyword (DuckDuckGo and Bing queried concurrently)
+        try:
+            budget = Deadline(time_budget)
+            urls = search_web(keyword, max_results=num_results, deadline=budget.remaining(cap=12))
+            # search results are already unwrapped locally; only undecodable redirect links hit the network
+            try:
+                from crawleragent import resolve_final_urls
+                urls = resolve_final_urls(urls, wrapped_only=True, total_timeout=budget.remaining(cap=20))
+            except Exception:
+                pass
+            st.session_state.crawler_text = "\n".join(urls) if urls else ""
+            st.session_state.crawler_urls = urls
+            st.session_state.sentiment_results = []
+            if urls:
+                # Rows are appended as pages finish downloading, one placeholder per duplicate
+                # group, redrawn when the group's record changes (new duplicate, or an earlier
+                # search result taking over); the first half of the progress bar tracks pages
+                # fetched and scored, the second half finished LLM tasks.
+                st.markdown("### 🔎 Discovered blogs & per-URL sentiment")
+                rows = st.container()
+                order = {u: n for n, u in enumerate(urls)}
+                latest = {}
+                placeholders = {}
+                for completed, total, group, item in iter_sentiment_for_urls(urls, deadline=budget.remaining(), languages=language.parse_languages(target_languages)):
+                    progress_bar.progress(0.5 * completed / total)
+                    status_text.info(f"Fetching and scoring pages: {completed}/{total}")
+                    if item is None:
+                        continue
+                    latest[group] = item
+                    try:
+                        if group not in placeholders:
+                            with rows:
+                                placeholders[group] = st.empty()
+                        with placeholders[group].container():
+                            render_sentiment_row(item)
+                    except Exception:
+                        # non-critical; continue without blocking analysis
+                        pass
+                results = sorted(latest.values(), key=lambda r: order.get(r['url'], len(order)))
+                st.session_state.sentiment_results = results
+                lines = [f"{item.get('label','unknown').upper()} ({item.get('error') or item.get('polarity')}) - {item.get('url')}" for item in results]
+                st.session_state.sentiment_text = "\n".join(lines)
+                st.markdown('---')
+        except Exception:
+            st.session_state.crawler_urls = st.session_state.get('crawler_urls', [])
+            st.session_state.sentiment_results = st.session_state.get('sentiment_results', [])
+        render_cache_stats()
         
+        status_text.info("⭐Initializing AI agents...")
+
         CrawlerAgent = get_crawler_agent()
         CleanerAgent = get_cleaner_agent()
         AnalyzerAgent = get_analyzer_agent()
         SentimentAgent = get_sentiment_agent()
         ReporterAgent = get_reporter_agent()
         CommentAgent = get_comment_agent()
-        
+
         tasks = []
+        agent_names = ["🕷️ Crawler", "🧹 Cleaner", "🔍 Analyzer", "😊 Sentiment", "📝 Reporter", "💬 Commenter"]
+        tasks_done = []
 
-        # Run a deterministic web search to get real URLs for the keyword (prefer DuckDuckGo, fallback to Bing)
-        try:
-            urls = search_duckduckgo(keyword, max_results=num_results)
-            if not urls:
-                urls = search_bing(keyword, max_results=num_results)
-            # resolve redirects to show clean target URLs
+        def task_started(i):
             try:
-                from crawleragent import resolve_final_urls
-                urls = resolve_final_urls(urls)
+                agent_containers[i].markdown(
+                    f'<div class="agent-box"><b>{agent_names[i]} Agent:</b> ⏳ Running...</div>',
+                    unsafe_allow_html=True
+                )
             except Exception:
                 pass
-            st.session_state.crawler_text = "\n".join(urls) if urls else ""
-            st.session_state.crawler_urls = urls
-            if urls:
-                st.session_state.sentiment_results = analyze_sentiment_for_urls(urls)
-                lines = [f"{item.get('label','unknown').upper()} ({item.get('polarity')}) - {item.get('url')}" for item in st.session_state.sentiment_results]
-                st.session_state.sentiment_text = "\n".join(lines)
-            else:
-                st.session_state.sentiment_results = []
 
-            # Immediately show discovered URLs and per-URL sentiment so the user sees findings
+        def task_done(i):
+            """Mark agent `i` finished and advance the bar by finished tasks."""
+            tasks_done.append(i)
             try:
-                urls_preview = st.session_state.get('crawler_urls', [])
-                sr_preview = st.session_state.get('sentiment_results', [])
-                if urls_preview:
-                    st.markdown("### 🔎 Discovered blogs & per-URL sentiment")
-                    for item in sr_preview:
-                        url = item.get('url')
-                        label = item.get('label', 'unknown')
-                        pol = item.get('polarity')
-                        subj = item.get('subjectivity')
-                        excerpt = item.get('excerpt', '')
-                        st.markdown(f"- **{label.upper()}** — ({pol}, subj={subj}) — [{url}]({url})")
-                        if excerpt:
-                            st.text(excerpt[:400] + ("..." if len(excerpt) > 400 else ""))
-                    st.markdown('---')
+                agent_containers[i].markdown(
+                    f'<div class="agent-box"><b>{agent_names[i]} Agent:</b> ✅ Completed</div>',
+                    unsafe_allow_html=True
+                )
+                progress_bar.progress(0.5 + 0.5 * len(tasks_done) / len(agent_names))
             except Exception:
-                # non-critical; continue without blocking analysis
                 pass
-        except Exception:
-            st.session_state.crawler_urls = st.session_state.get('crawler_urls', [])
-            st.session_state.sentiment_results = st.session_state.get('sentiment_results', [])
-        
+
         agent_containers[0].markdown(
             '<div class="agent-box">🕷️ <b>Crawler Agent:</b> Searching for blog posts...</div>',
             unsafe_allow_html=True
         )
-        progress_bar.progress(0.15)
         
         crawl_task = Task(
             description=f"Search and find blog posts about '{keyword}'. Provide a summary of the content found.",
@@ -199,12 +284,12 @@ if analyze_button and keyword:
             '<div class="agent-box">🧹 <b>Cleaner Agent:</b> Cleaning and processing text...</div>',
             unsafe_allow_html=True
         )
-        progress_bar.progress(0.3)
         
         clean_task = Task(
             description="Clean and normalize the text content. Remove noise and prepare for analysis.",
             agent=CleanerAgent,
-            expected_output="Clean, normalized text ready for analysis"
+            expected_output="Clean, normalized text ready for analysis",
+            context=[crawl_task]
         )
         tasks.append(clean_task)
         
@@ -212,12 +297,12 @@ if analyze_button and keyword:
             '<div class="agent-box">🔍 <b>Analyzer Agent:</b> Analyzing topics and themes...</div>',
             unsafe_allow_html=True
         )
-        progress_bar.progress(0.45)
         
         analyze_task = Task(
             description=f"Analyze the content about '{keyword}'. Identify key topics, themes, and main ideas.",
             agent=AnalyzerAgent,
-            expected_output="Key topics, themes, and insights from the content"
+            expected_output="Key topics, themes, and insights from the content",
+            context=[clean_task]
         )
         tasks.append(analyze_task)
         
@@ -225,12 +310,12 @@ if analyze_button and keyword:
             '<div class="agent-box">😊 <b>Sentiment Agent:</b> Detecting emotional tone...</div>',
             unsafe_allow_html=True
         )
-        progress_bar.progress(0.6)
         
         sentiment_task = Task(
             description="Analyze the sentiment and emotional tone of the content. Determine if it's positive, negative, or neutral.",
             agent=SentimentAgent,
-            expected_output="Sentiment analysis with emotional tone classification"
+            expected_output="Sentiment analysis with emotional tone classification",
+            context=[clean_task]
         )
         tasks.append(sentiment_task)
         
@@ -238,27 +323,28 @@ if analyze_button and keyword:
             '<div class="agent-box">📝 <b>Reporter Agent:</b> Generating comprehensive report...</div>',
             unsafe_allow_html=True
         )
-        progress_bar.progress(0.75)
 
-        sentiment_summary = ""
-        try:
-            sr = st.session_state.get('sentiment_results', [])
-            if sr:
-                sentiment_summary = json.dumps(sr, ensure_ascii=False, indent=2)
-        except Exception:
+        # pages in other languages were not scored and are left out of the report; the rest are
+        # sent as a token-budgeted table (report_prompt) instead of indented JSON with full excerpts
+        sr = [item for item in st.session_state.get('sentiment_results', []) if item.get('label') != 'filtered']
+        if sr:
+            sentiment_summary, prompt_info = build_sentiment_table(sr)
+            source_note = "The source URLs are listed in the table below."
+            st.caption(f"📝 Reporter input: {prompt_info['rows']} sources in {prompt_info['tokens']} tokens" + (f" ({prompt_info['omitted']} omitted)" if prompt_info['omitted'] else ""))
+        else:
             sentiment_summary = str(st.session_state.get('sentiment_text', ''))
-
-        crawler_urls_text = "\n".join(st.session_state.get('crawler_urls', []))
+            source_note = "Include the following detected source URLs:\n" + "\n".join(st.session_state.get('crawler_urls', []))
 
         report_task = Task(
             description=(
                 f"Create a comprehensive analysis report about '{keyword}' combining all findings.\n"
-                f"Include the following detected source URLs:\n{crawler_urls_text}\n\n"
+                f"{source_note}\n\n"
                 f"Per-URL sentiment data (polarity/subjectivity/label):\n{sentiment_summary}\n\n"
                 "Use the Analyzer and Sentiment outputs to produce a single, well-structured report"
             ),
             agent=ReporterAgent,
-            expected_output="Detailed analysis report with all insights"
+            expected_output="Detailed analysis report with all insights",
+            context=[analyze_task, sentiment_task]
         )
         tasks.append(report_task)
         
@@ -266,7 +352,6 @@ if analyze_button and keyword:
             '<div class="agent-box">💬 <b>Comment Agent:</b> Crafting personalized comment...</div>',
             unsafe_allow_html=True
         )
-        progress_bar.progress(0.9)
         
         comment_task = Task(
             description=f"""Based on ALL the analysis done on '{keyword}', write a SHORT blog comment (2-3 sentences max).
@@ -288,22 +373,32 @@ if analyze_button and keyword:
             
             Write ONLY the comment, nothing else.""",
             agent=CommentAgent,
-            expected_output="A short 2-3 sentence blog comment, nothing else"
+            expected_output="A short 2-3 sentence blog comment, nothing else",
+            context=[analyze_task, sentiment_task, report_task]
         )
         tasks.append(comment_task)
         
         status_text.info("Running multi-agent analysis...")
-        
-        crew = Crew(
-            agents=[CrawlerAgent, CleanerAgent, AnalyzerAgent, SentimentAgent, ReporterAgent, CommentAgent],
-            tasks=tasks,
-            verbose=False
+
+        # Each task runs as its own one-task Crew once the tasks in its context have finished,
+        # so Analyzer and Sentiment run side by side; Reporter waits for both, Comment for Reporter.
+        def run_task(task):
+            def _run(inputs):
+                return Crew(agents=[task.agent], tasks=[task], verbose=False).kickoff()
+            return _run
+
+        graph = {
+            i: ([tasks.index(dep) for dep in task.context] if isinstance(task.context, list) else [], run_task(task))
+            for i, task in enumerate(tasks)
+        }
+        outputs = task_graph.run_graph(
+            graph,
+            on_start=task_started,
+            on_done=lambda i, output: task_done(i),
         )
-        
-        result = crew.kickoff()
+        result = outputs[len(tasks) - 1]
         
         for i in range(6):
-            agent_names = ["🕷️ Crawler", "🧹 Cleaner", "🔍 Analyzer", "😊 Sentiment", "📝 Reporter", "💬 Commenter"]
             agent_containers[i].markdown(
                 f'<div class="agent-box"><b>{agent_names[i]} Agent:</b> ✅ Completed</div>',
                 unsafe_allow_html=True
@@ -311,12 +406,16 @@ if analyze_button and keyword:
         
         progress_bar.progress(1.0)
         status_text.success("✅ Analysis Complete!")
+        render_cache_stats()
+        run_llm_stats = llm_cache.stats_since(llm_stats_before)
+        if run_llm_stats['hits']:
+            st.caption(f"🤖 {run_llm_stats['hits']} of {run_llm_stats['hits'] + run_llm_stats['misses']} LLM calls answered from cache this run (~{run_llm_stats['saved_tokens']} tokens saved)")
         
 
         def get_task_output(task_index):
             try:
-                if hasattr(result, 'tasks_output') and len(result.tasks_output) > task_index:
-                    task_out = result.tasks_output[task_index]
+                if task_index in outputs and getattr(outputs[task_index], 'tasks_output', None):
+                    task_out = outputs[task_index].tasks_output[0]
                     if hasattr(task_out, 'raw'):
                         return str(task_out.raw)
                     elif hasattr(task_out, 'exported_output'):
@@ -349,7 +448,7 @@ if analyze_button and keyword:
         st.session_state.cleaner_text = cleaner_output
         st.session_state.analyzer_text = analyzer_output
         st.session_state.sentiment_text = sentiment_output
-        # sentiment results are prepared earlier via search_duckduckgo and sentiment_utils
+        # sentiment results are prepared earlier via search_web and sentiment_utils
         st.session_state.report_text = report_output  
         st.session_state.comment_text = comment_output  
         st.session_state.analysis_complete = True
@@ -357,6 +456,7 @@ if analyze_button and keyword:
         st.rerun()
         
     except Exception as e:
+        render_cache_stats()
         status_text.error(f"❌ Error: {str(e)}")
         st.error("**Troubleshooting:**\n- Verify .env has OPENROUTER_API_KEY\n- Check conda environment is activated\n- Ensure internet connection")
 
@@ -500,6 +600,19 @@ elif st.session_state.analysis_complete:
         urls = st.session_state.get('crawler_urls', [])
         sr = st.session_state.get('sentiment_results', [])
         if urls and sr:
+            # pages that were not scored (failed, skipped, other language) have nothing to comment on
+            commentable = [item for item in sr if item.get('polarity') is not None]
+            if commentable and st.button(f"Generate comments for all {len(commentable)} URLs", key="gen_all"):
+                with st.spinner("Generating comments..."):
+                    generated = generate_comments(commentable, [st.session_state.keyword])
+                failed = 0
+                for item, (ok, out) in zip(commentable, generated):
+                    if ok:
+                        st.session_state.setdefault('url_comments', {})[item['url']] = out
+                    else:
+                        failed += 1
+                if failed:
+                    st.warning(f"No comment could be generated for {failed} of {len(commentable)} URLs")
             for item in sr:
                 url = item.get('url')
                 label = item.get('label', 'unknown')
@@ -507,35 +620,18 @@ elif st.session_state.analysis_complete:
                 excerpt = item.get('excerpt','')
                 col1, col2, col3 = st.columns([6,2,2])
                 with col1:
-                    st.markdown(f"**{label.upper()} ({pol})** — [{url}]({url})")
+                    st.markdown(f"**{label.upper()} ({item.get('error') or pol})** — [{url}]({url})")
                     st.write(excerpt[:300] + ("..." if len(excerpt)>300 else ""))
                 with col2:
                     if st.button(f"Generate comment for this URL", key=f"gen_{url}"):
-                        try:
-                            CommentAgent = get_comment_agent()
-                            task = Task(
-                                description=(
-                                    f"Write a short 1-2 sentence blog comment for the article at {url}.\n"
-                                    f"Article excerpt: {excerpt[:800]}\n"
-                                    f"Detected sentiment: {label} (polarity={pol})\n"
-                                    "Output ONLY the comment text, 1-2 sentences."
-                                ),
-                                agent=CommentAgent,
-                                expected_output="Short blog comment"
-                            )
-                            one_crew = Crew(agents=[CommentAgent], tasks=[task], verbose=False)
-                            one_result = one_crew.kickoff()
-                            # try to extract output
-                            out = ""
-                            if hasattr(one_result, 'tasks_output') and one_result.tasks_output:
-                                to = one_result.tasks_output[0]
-                                out = getattr(to, 'raw', None) or getattr(to, 'exported_output', None) or str(to)
-                            st.success("Generated comment:")
-                            st.write(out)
-                            # store per-url comment
+                        ok, out = generate_comments([item], [st.session_state.keyword])[0]
+                        if ok:
                             st.session_state.setdefault('url_comments', {})[url] = out
-                        except Exception as e:
-                            st.error(f"Failed to generate comment: {e}")
+                        else:
+                            st.error(out)
+                    if url in st.session_state.get('url_comments', {}):
+                        st.success("Generated comment:")
+                        st.write(st.session_state['url_comments'][url])
                 with col3:
                     st.info("Posting comments to arbitrary external sites has been disabled for safety.")
         else:
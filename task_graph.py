@@ -0,0 +1,60 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+# Runs a small graph of dependent jobs (the agents' LLM tasks) on a thread pool. Each node names
+# the nodes whose outputs it needs; a node starts as soon as all of those have finished, so
+# independent nodes (Analyzer and Sentiment) run side by side and the whole graph takes about
+# as long as its longest chain instead of the sum of all nodes.
+
+DEFAULT_CONCURRENCY = int(os.getenv("LLM_TASK_CONCURRENCY", "3"))
+
+# name -> (names of the nodes it depends on, fn(inputs) -> output); `inputs` maps each
+# dependency's name to its output.
+Graph = Dict[str, Tuple[Sequence[str], Callable[[dict], Any]]]
+
+
+def depth(nodes: Graph) -> int:
+    """Number of nodes on the longest dependency chain."""
+    memo = {}
+
+    def level(name: str) -> int:
+        if name not in memo:
+            memo[name] = 1 + max((level(d) for d in nodes[name][0]), default=0)
+        return memo[name]
+
+    return max((level(name) for name in nodes), default=0)
+
+
+def run_graph(nodes: Graph, concurrency: int = DEFAULT_CONCURRENCY, on_start: Optional[Callable[[str], None]] = None, on_done: Optional[Callable[[str, Any], None]] = None) -> dict:
+    """Run every node once its dependencies are done, at most `concurrency` at a time.
+
+    Returns {name: output}. `on_start` / `on_done` are called in the calling thread (safe for
+    Streamlit updates). The first node that raises stops the run: nodes not yet started are
+    dropped, running ones are waited for, and the exception propagates.
+    """
+    for name, (deps, _) in nodes.items():
+        unknown = [d for d in deps if d not in nodes]
+        if unknown:
+            raise ValueError(f"task {name!r} depends on unknown task(s) {unknown}")
+    results = {}
+    pending = dict(nodes)
+    running = {}
+    concurrency = max(1, concurrency)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while pending or running:
+            ready = [name for name, (deps, _) in pending.items() if all(d in results for d in deps)]
+            for name in ready[:concurrency - len(running)]:
+                deps, fn = pending.pop(name)
+                if on_start:
+                    on_start(name)
+                running[pool.submit(fn, {d: results[d] for d in deps})] = name
+            if not running:
+                raise ValueError(f"dependency cycle among tasks {sorted(pending)}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+                if on_done:
+                    on_done(name, results[name])
+    return results
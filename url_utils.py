@@ -0,0 +1,122 @@
+import base64
+import binascii
+import re
+from urllib.parse import urlparse, urlunparse, parse_qs
+
+
+def _decode_ddg(parsed) -> str:
+    """DuckDuckGo: //duckduckgo.com/l/?uddg=<percent-encoded target>&rut=..."""
+    values = parse_qs(parsed.query).get("uddg")
+    return values[0] if values else ""
+
+
+def _decode_bing(parsed) -> str:
+    """Bing: https://www.bing.com/ck/a?!&&p=...&u=a1<urlsafe base64 target>&ntb=1"""
+    values = parse_qs(parsed.query).get("u")
+    if not values:
+        return ""
+    encoded = values[0]
+    if not encoded.startswith("a1"):
+        return ""
+    encoded = encoded[2:]
+    encoded += "=" * (-len(encoded) % 4)
+    try:
+        return base64.urlsafe_b64decode(encoded).decode("utf-8")
+    except (binascii.Error, ValueError):
+        return ""
+
+
+def _parse(href: str):
+    href = (href or "").strip()
+    if href.startswith("//"):
+        href = "https:" + href
+    return urlparse(href)
+
+
+def is_search_redirect(href: str) -> bool:
+    """True if `href` is a DuckDuckGo or Bing click-tracking wrapper rather than a real target."""
+    try:
+        parsed = _parse(href)
+    except ValueError:
+        return False
+    host = parsed.netloc.lower()
+    if host == "duckduckgo.com" or host.endswith(".duckduckgo.com"):
+        return parsed.path.startswith("/l/") or parsed.path == "/y.js"
+    if host == "bing.com" or host.endswith(".bing.com"):
+        return parsed.path.startswith("/ck/")
+    return False
+
+
+def unwrap_search_url(href: str) -> str:
+    """Decode a DuckDuckGo/Bing redirect link offline and return the real target URL.
+
+    Links that are not wrappers, or wrappers that cannot be decoded, are returned unchanged
+    (protocol-relative links get an https: scheme). No network access is performed.
+    """
+    try:
+        parsed = _parse(href)
+    except ValueError:
+        return href
+    fallback = parsed.geturl() if (href or "").strip().startswith("//") else href
+    if not is_search_redirect(href):
+        return fallback
+    decoder = _decode_ddg if "duckduckgo.com" in parsed.netloc.lower() else _decode_bing
+    target = decoder(parsed)
+    if target.startswith(("http://", "https://")):
+        return target
+    return fallback
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL for use as a cache key.
+
+    Lowercases scheme and host, drops default ports and the #fragment, and sorts query parameters.
+    """
+    try:
+        parsed = _parse(url)
+        port = parsed.port
+    except ValueError:
+        return url
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    if (scheme, port) in (("http", 80), ("https", 443)):
+        port = None
+    netloc = f"{host}:{port}" if port else host
+    query = "&".join(sorted(p for p in parsed.query.split("&") if p))
+    return urlunparse((scheme, netloc, parsed.path or "/", parsed.params, query, ""))
+
+
+# Query parameters that only track where a click came from; they never change the page.
+# ("ref" is not one of them: it also selects content, e.g. a git branch in ?ref=dev.)
+_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "mc_cid", "mc_eid", "igshid", "ref_src",
+    "cmpid", "smid", "sr_share", "ncid", "ito", "guccounter", "amp", "outputtype",
+}
+_TRACKING_PREFIXES = ("utm_", "_hs", "pk_", "oly_")
+_AMP_SEGMENT = re.compile(r"/amp(?:\.html?)?(?=/|$)", re.I)
+
+
+def canonical_url(url: str) -> str:
+    """Collapse URL variants of the same article to one key (for duplicate detection, not fetching).
+
+    On top of normalize_url: forces https, drops "www."/"m."/"amp." host prefixes, tracking
+    parameters (utm_*, fbclid, ...), AMP path segments and a trailing slash.
+    """
+    try:
+        parsed = _parse(normalize_url(url))
+    except ValueError:
+        return url
+    if parsed.scheme not in ("http", "https"):
+        return url
+    host = parsed.netloc
+    for prefix in ("www.", "m.", "amp."):
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    path = _AMP_SEGMENT.sub("", parsed.path).rstrip("/") or "/"
+    params = []
+    for pair in parsed.query.split("&"):
+        name = pair.split("=", 1)[0].lower()
+        if pair and name not in _TRACKING_PARAMS and not name.startswith(_TRACKING_PREFIXES):
+            params.append(pair)
+    return urlunparse(("https", host, path, parsed.params, "&".join(params), ""))